@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import build_site
+from sources.clustering import cluster
+from sources.common import SG_TZ, Event, dedupe, dedupe_key, event_span
+
+SYLLABLES = "ka lo mi ne ra su ti vo ba de fi gu ha je ko lu ma no pe ri".split()
+# 400 made-up words, so unrelated titles almost never collide by chance.
+WORDS = [a + b for a in SYLLABLES for b in SYLLABLES]
+SOURCES = ["esplanade", "srt", "gateway", "sso", "sco", "nhb", "acm", "gallery"]
+
+
+def synthetic_events(count: int, seed: int = 7) -> tuple[list[dict], int, int]:
+    """Rows with exact repeats and cross-source title variants planted.
+
+    Returns the rows, how many planted near-duplicates they contain and how
+    many distinct events they describe.
+    """
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1, 19, 30, tzinfo=SG_TZ)
+    rows: list[dict] = []
+    planted = 0
+    groups: list[int] = []
+    while len(rows) < count:
+        title = " ".join(rng.sample(WORDS, 4)).title()
+        start = base + timedelta(days=rng.randrange(365))
+        end = start + timedelta(days=rng.choice([0, 0, 0, 2, 30]))
+        source = rng.choice(SOURCES)
+        row = {
+            "title": title,
+            "url": f"https://{source}.example.sg/whats-on/{len(rows)}",
+            "source": source,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "categories": ["Theatre"],
+        }
+        rows.append(row)
+        groups.append(len(rows))
+        roll = rng.random()
+        if roll < 0.1:
+            rows.append(dict(row))
+            groups.append(groups[-1])
+        elif roll < 0.2:
+            # The same show on another site, with a suffix and another URL.
+            other = rng.choice([s for s in SOURCES if s != source])
+            rows.append(dict(
+                row,
+                title=f"{title} Live",
+                url=f"https://{other}.example.sg/events/{len(rows)}",
+                source=other,
+                start=(start + timedelta(hours=rng.choice([0, 2]))).isoformat(),
+            ))
+            groups.append(groups[-1])
+            planted += 1
+    return rows[:count], planted, len(set(groups[:count]))
+
+
+def to_event(row: dict) -> Event:
+    return Event.from_dict(row)
+
+
+def bench(label: str, func, rows, expected: int) -> float:
+    started = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - started
+    per_row = elapsed / len(rows) * 1e6
+    print(
+        f"  {label:<18} {elapsed:7.2f}s  {per_row:6.1f} us/row"
+        f"  -> {len(result)} events ({len(result) - expected:+d} vs planted)"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared dedupe engine")
+    parser.add_argument("--sizes", default="12500,25000,50000,100000", help="comma-separated row counts")
+    args = parser.parse_args()
+
+    for size in [int(n) for n in args.sizes.split(",")]:
+        rows, planted, expected = synthetic_events(size)
+        print(f"{size} rows, {expected} distinct events ({planted} planted cross-source variants)")
+        events = [to_event(r) for r in rows]
+        bench(
+            "cluster",
+            lambda evs: cluster(evs, keys=lambda ev: [dedupe_key(ev)], title=lambda ev: ev.title, span=event_span),
+            events,
+            expected,
+        )
+        bench("scrape dedupe", dedupe, events, expected)
+        bench("build_site dedupe", build_site.dedupe_and_enrich_events, rows, expected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import time
+from html import escape
+
+import build_site
+from bench_dedupe import synthetic_events
+from template import Template
+
+
+def chained_replace(ev) -> str:
+    """The old renderer: one str.replace pass over the template per placeholder."""
+    source = escape(build_site.SOURCE_LABELS.get(ev.get("source") or "", str(ev.get("source") or "").title()))
+    categories = build_site.normalize_categories(ev.get("categories"))
+    desc_parts = [
+        str(ev.get("venue") or "").strip(),
+        str(ev.get("price") or "").strip(),
+        build_site._age_label(ev),
+        ", ".join(categories),
+        build_site._event_date_label(ev),
+    ]
+    pills = [f'<span class="pill">{escape(cat)}</span>' for cat in categories]
+    pills.append(f'<span class="pill">{source}</span>')
+    return (
+        build_site.DETAIL_TEMPLATE.source.replace("__TITLE__", escape(str(ev.get("title") or "Untitled Event")))
+        .replace("__SITE_TITLE__", build_site.SITE_TITLE)
+        .replace("__DESCRIPTION__", escape(" | ".join([p for p in desc_parts if p])))
+        .replace("__CANONICAL__", escape(build_site.BASE_URL.rstrip("/") + "/" + str(ev.get("detail_url") or "")))
+        .replace("__SOURCE__", source)
+        .replace("__DATE_LABEL__", escape(build_site._event_date_label(ev)))
+        .replace("__VENUE__", escape(str(ev.get("venue") or "Not specified")))
+        .replace("__PRICE__", escape(str(ev.get("price") or "Not specified")))
+        .replace("__AGE__", escape(build_site._age_label(ev)))
+        .replace("__CATEGORIES__", escape(", ".join(categories) or "Uncategorized"))
+        .replace("__PILLS__", "".join(pills))
+        .replace("__SOURCE_URL__", escape(str(ev.get("url") or "#")))
+    )
+
+
+def template_render(ev) -> str:
+    return build_site.render_event_page(build_site.event_view(ev))
+
+
+def fill_by_replace(template: Template, values) -> str:
+    text = template.source
+    for slot, value in values.items():
+        text = text.replace(f"__{slot}__", escape(value))
+    return text
+
+
+def bench(label: str, render, events) -> float:
+    started = time.perf_counter()
+    for ev in events:
+        render(ev)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<16} {elapsed:6.2f}s  {elapsed / len(events) * 1e6:6.1f} us/page")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detail page rendering")
+    parser.add_argument("--pages", type=int, default=10000)
+    args = parser.parse_args()
+
+    rows, _, _ = synthetic_events(int(args.pages * 1.3))
+    events = build_site.dedupe_and_enrich_events(rows)[: args.pages]
+    mismatched = sum(chained_replace(ev) != template_render(ev) for ev in events)
+    print(f"{len(events)} detail pages ({mismatched} differ between renderers)")
+
+    # A title holding a placeholder is inserted once, never substituted again.
+    trap = dict(events[0], title="Story __VENUE__ time")
+    print(f"  placeholder in title survives: {'Story __VENUE__ time' in template_render(trap)}")
+    print(f"  whole-template replace passes would re-substitute it: {'Story __VENUE__ time' not in chained_replace(trap)}")
+
+    print("whole page (field formatting included)")
+    old = bench("str.replace", chained_replace, events)
+    new = bench("Template.render", template_render, events)
+    print(f"  speedup {old / new:.2f}x")
+
+    for name in ("DETAIL_TEMPLATE", "HTML_TEMPLATE"):
+        template = getattr(build_site, name)
+        print(f"template fill only: {name} ({len(template.source)} chars, {len(template.names)} names)")
+        values = {slot: f"value of {slot}" for slot in template.names}
+        old = bench("str.replace", lambda _: fill_by_replace(template, values), events)
+        new = bench("Template.render", lambda _: template.render(**values), events)
+        print(f"  speedup {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
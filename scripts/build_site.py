@@ -1,20 +1,46 @@
 from __future__ import annotations
 
-import hashlib
+import argparse
+import functools
 import json
+import os
 import re
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from html import escape
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import urlsplit, urlunsplit
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import pytz
 
+import event_schema
+import event_store
+from event_schema import (
+    NORMALIZATION_VERSION,
+    canonical_event_url,
+    normalize_age_ranges,
+    normalize_categories,
+    normalize_row,
+    summarize_age_ranges,
+    to_int_or_none,
+)
+from identity_index import IdentityIndex, slugify
+from site_writer import SiteWriter, file_hash, input_hash
+from sources.clustering import cluster
+from sources.common import PRICE_FIELDS, parse_price
+from template import Raw, Template
+
 SG_TZ = pytz.timezone("Asia/Singapore")
 SITE_TITLE = "Singapore Social Events Weekly"
 SITE_DESC = "Social and cultural events in Singapore across theatre, music, dance, museums, and more."
 BASE_URL = "https://sam121.github.io/sg-kids-culture/"
+IDENTITY_PATH = Path("data/identity.json")
+# Shard holding events with no usable dates.
+UNDATED_SHARD = "tbc"
+# Age filter buckets, as in the page's ageFilterOptions.
+AGE_BUCKETS = {"0-5": (0, 5), "6-12": (6, 12), "13-17": (13, 17)}
+# Upper bounds (S$) of the price bands the max-price filter is answered from.
+PRICE_BANDS = (0, 10, 20, 30, 50, 100)
 
 SOURCE_LABELS = {
     "esplanade": "Esplanade",
@@ -63,7 +89,7 @@ SCRAPED_PLACE_ORDER = [
 ]
 
 
-HTML_TEMPLATE = """<!doctype html>
+HTML_TEMPLATE = Template("""<!doctype html>
 <html lang=\"en\">
 <head>
   <meta charset=\"utf-8\" />
@@ -332,7 +358,185 @@ HTML_TEMPLATE = """<!doctype html>
   </div>
 
   <script>
-    const events = __EVENTS_JSON__;
+    // Events overlapping this week, this month and next month; other months
+    // are fetched from the shards in shardManifest when the filter needs them.
+    // Both come column-wise (see encode_events in build_site.py).
+    function slugify(title) {
+      const slug = String(title || 'untitled').toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-+|-+$/g, '');
+      return (slug || 'event').slice(0, 80);
+    }
+
+    function sgDayTag(minutes) {
+      // Singapore is UTC+8 all year.
+      const d = new Date((minutes + 480) * 60000);
+      return `${d.getUTCFullYear()}${String(d.getUTCMonth() + 1).padStart(2, '0')}${String(d.getUTCDate()).padStart(2, '0')}`;
+    }
+
+    class DecodedEvent {
+      constructor(cols, i) {
+        const dict = cols.dict;
+        const start = cols.start[i];
+        const base = cols.url_base[i];
+        const venue = cols.venue[i];
+        const codes = cols.categories[i];
+        const categories = new Array(codes.length);
+        for (let j = 0; j < codes.length; j += 1) categories[j] = dict.category[codes[j]];
+        this.id = cols.id[i];
+        this.title = cols.title[i];
+        this.url = base === null ? null : dict.url[base] + cols.url[i];
+        this.tie = cols.tie[i];
+        this.days = cols.days[i];
+        this.date_label = dict.label[cols.date_label[i]];
+        this.source = dict.source[cols.source[i]];
+        this.venue = venue === null ? null : dict.venue[venue];
+        this.price = cols.price[i];
+        this.price_min = cols.price_min[i];
+        this.is_free = cols.is_free[i] === 1;
+        this.categories = categories;
+        this.age_ranges = cols.ages[i];
+        this.age_min = null;
+        this.age_max = null;
+        this.page = cols.page[i];
+        this.startMinutes = start;
+      }
+
+      // Rebuilt on first use: only events without an official URL link to it.
+      get detail_url() {
+        if (this.page === null) {
+          const tag = this.startMinutes === null ? 'tbc' : sgDayTag(this.startMinutes);
+          this.page = `events/${slugify(this.title)}-${tag}-${this.id}.html`;
+        }
+        return this.page || null;
+      }
+    }
+
+    function decodeEvents(cols) {
+      const rows = new Array(cols.count);
+      for (let i = 0; i < cols.count; i += 1) rows[i] = new DecodedEvent(cols, i);
+      return rows;
+    }
+
+    // Filters are answered from per-value bitsets over `events`, built from
+    // the facet postings each payload carries: OR within a filter, AND across.
+    const events = [];
+    const minPrices = [];
+    const knownIds = new Set();
+    const facetBits = {
+      age: new Map(), category: new Map(), month: new Map(), location: new Map(), source: new Map(), price: new Map(), free: new Map(),
+    };
+    let bitWords = 0;
+    let sortedOrder = [];
+
+    function growBitsets(count) {
+      const words = (count + 31) >>> 5;
+      if (words <= bitWords) return;
+      const next = Math.max(words, bitWords * 2);
+      Object.values(facetBits).forEach(map => map.forEach((bits, value) => {
+        const grown = new Uint32Array(next);
+        grown.set(bits);
+        map.set(value, grown);
+      }));
+      bitWords = next;
+    }
+
+    function addEvents(cols) {
+      const rows = decodeEvents(cols);
+      const globalIndex = new Int32Array(rows.length).fill(-1);
+      rows.forEach((ev, i) => {
+        if (knownIds.has(ev.id)) return;
+        knownIds.add(ev.id);
+        globalIndex[i] = events.length;
+        events.push(ev);
+        minPrices.push(ev.price_min);
+      });
+      growBitsets(events.length);
+      Object.entries(cols.facets).forEach(([facet, values]) => {
+        Object.entries(values).forEach(([value, postings]) => {
+          let bits = facetBits[facet].get(value);
+          if (!bits) {
+            bits = new Uint32Array(bitWords);
+            facetBits[facet].set(value, bits);
+          }
+          postings.forEach(i => {
+            const g = globalIndex[i];
+            if (g >= 0) bits[g >>> 5] |= 1 << (g & 31);
+          });
+        });
+      });
+      sortedOrder = events.map((_, i) => i).sort((a, b) => eventSort(events[a], events[b]));
+    }
+
+    function facetUnion(facet, values) {
+      const out = new Uint32Array(bitWords);
+      values.forEach(value => {
+        const bits = facetBits[facet].get(value);
+        if (!bits) return;
+        for (let w = 0; w < bitWords; w += 1) out[w] |= bits[w];
+      });
+      return out;
+    }
+
+    function priceAtMost(max) {
+      // Whole bands under the limit, then a per-event check in the band it falls in.
+      const out = new Uint32Array(bitWords);
+      let boundary = null;
+      let boundaryUpper = Infinity;
+      facetBits.price.forEach((bits, band) => {
+        const upper = band === 'more' ? Infinity : Number(band);
+        if (upper <= max) {
+          for (let w = 0; w < bitWords; w += 1) out[w] |= bits[w];
+        } else if (upper < boundaryUpper || boundary === null) {
+          boundary = bits;
+          boundaryUpper = upper;
+        }
+      });
+      if (boundary) {
+        for (let w = 0; w < bitWords; w += 1) {
+          let word = boundary[w];
+          while (word) {
+            const bit = 31 - Math.clz32(word);
+            word &= ~(1 << bit);
+            const i = (w << 5) + bit;
+            if (minPrices[i] <= max) out[w] |= 1 << bit;
+          }
+        }
+      }
+      return out;
+    }
+
+    function filterBits() {
+      let acc = null;
+      const apply = bits => {
+        if (acc === null) {
+          acc = bits;
+        } else {
+          for (let w = 0; w < bitWords; w += 1) acc[w] &= bits[w];
+        }
+      };
+      [['age', state.age], ['category', state.category], ['location', state.location], ['source', state.source]].forEach(([facet, selection]) => {
+        const values = normalizeMultiSelection(selection);
+        if (!values.includes('all')) apply(facetUnion(facet, values));
+      });
+      if (state.month !== 'all') apply(facetUnion('month', [state.month]));
+      if (state.priceMode === 'free') {
+        apply(facetUnion('free', ['free']));
+      } else if (state.maxPrice !== null && state.maxPrice !== undefined && !Number.isNaN(state.maxPrice)) {
+        apply(priceAtMost(state.maxPrice));
+      }
+      return acc;
+    }
+
+    function filteredEvents() {
+      const bits = filterBits();
+      if (bits === null) return sortedOrder.map(i => events[i]);
+      const rows = [];
+      sortedOrder.forEach(i => {
+        if (bits[i >>> 5] & (1 << (i & 31))) rows.push(events[i]);
+      });
+      return rows;
+    }
+
+    const shardManifest = __SHARDS_JSON__;
     const sourceLabels = __SOURCE_LABELS_JSON__;
     const ageFilterOptions = [
       { value: 'all', label: 'All ages' },
@@ -399,12 +603,6 @@ HTML_TEMPLATE = """<!doctype html>
       return sourceLabel(ev.source);
     }
 
-    function parseDateSafe(iso) {
-      if (!iso) return null;
-      const d = new Date(iso);
-      return Number.isNaN(d.getTime()) ? null : d;
-    }
-
     function sgParts(date, opts) {
       return new Intl.DateTimeFormat('en-SG', Object.assign({ timeZone: 'Asia/Singapore' }, opts)).formatToParts(date);
     }
@@ -451,41 +649,18 @@ HTML_TEMPLATE = """<!doctype html>
       return `${names[mm - 1]} ${yy}`;
     }
 
-    function nextMonthKey(key) {
-      const [yy, mm] = key.split('-').map(Number);
-      if (!yy || !mm) return key;
-      const month = mm === 12 ? 1 : mm + 1;
-      const year = mm === 12 ? yy + 1 : yy;
-      return `${year}-${String(month).padStart(2, '0')}`;
-    }
-
-    function eventDateSpan(ev) {
-      const start = parseDateSafe(ev.start);
-      const end = parseDateSafe(ev.end);
-      if (!start && !end) return null;
-      const startKey = sgDateKey(start || end);
-      const endKey = sgDateKey(end || start);
-      if (!startKey || !endKey) return null;
-      return startKey <= endKey ? [startKey, endKey] : [endKey, startKey];
-    }
-
-    function eventMonthSpan(ev) {
-      const span = eventDateSpan(ev);
-      if (!span) return null;
-      return [span[0].slice(0, 7), span[1].slice(0, 7)];
+    function dayNumber(key) {
+      // 'YYYY-MM-DD' as the YYYYMMDD integers events carry in `days`.
+      return Number(key.replaceAll('-', ''));
     }
 
     function allMonthKeys(rows) {
       const set = new Set();
       rows.forEach(ev => {
-        const span = eventMonthSpan(ev);
-        if (!span) return;
-        let key = span[0];
-        while (key <= span[1]) {
-          set.add(key);
-          const nxt = nextMonthKey(key);
-          if (nxt === key) break;
-          key = nxt;
+        if (!ev.days) return;
+        const last = Math.floor(ev.days[1] / 100);
+        for (let month = Math.floor(ev.days[0] / 100); month <= last; month += month % 100 === 12 ? 89 : 1) {
+          set.add(`${Math.floor(month / 100)}-${String(month % 100).padStart(2, '0')}`);
         }
       });
       return Array.from(set).sort();
@@ -520,65 +695,12 @@ HTML_TEMPLATE = """<!doctype html>
       return `${first}-${last}`;
     }
 
-    function sameDayInSingapore(left, right) {
-      return sgDateKey(left) === sgDateKey(right);
-    }
-
-    function isMidnightInSingapore(date) {
-      const parts = sgParts(date, { hour: '2-digit', minute: '2-digit', hour12: false });
-      const hh = parts.find(p => p.type === 'hour')?.value;
-      const mm = parts.find(p => p.type === 'minute')?.value;
-      return hh === '00' && mm === '00';
-    }
-
-    function formatDateOnly(date) {
-      return date.toLocaleDateString('en-SG', { timeZone: 'Asia/Singapore', day: 'numeric', month: 'short', year: 'numeric' });
-    }
-
-    function formatDateTime(date) {
-      return date.toLocaleString('en-SG', { timeZone: 'Asia/Singapore', day: 'numeric', month: 'short', year: 'numeric', hour: '2-digit', minute: '2-digit' });
-    }
-
-    function formatDateLabel(ev) {
-      const start = parseDateSafe(ev.start);
-      const end = parseDateSafe(ev.end);
-      if (start && end) {
-        if (sameDayInSingapore(start, end)) {
-          return `On ${isMidnightInSingapore(start) ? formatDateOnly(start) : formatDateTime(start)}`;
-        }
-        const left = isMidnightInSingapore(start) ? formatDateOnly(start) : formatDateTime(start);
-        const right = isMidnightInSingapore(end) ? formatDateOnly(end) : formatDateTime(end);
-        return `Runs ${left} to ${right}`;
-      }
-      if (start) return `From ${isMidnightInSingapore(start) ? formatDateOnly(start) : formatDateTime(start)}`;
-      if (typeof ev.raw_date === 'string' && ev.raw_date.trim()) return `Dates: ${ev.raw_date.trim()}`;
-      return 'Date TBC';
-    }
-
-    function eventMinPrice(ev) {
-      const txt = String(ev.price || '').trim();
-      if (!txt) return null;
-      if (/\bfree\b/i.test(txt)) return 0;
-      const nums = txt.replace(/,/g, '').match(/\d+(?:\.\d+)?/g);
-      if (!nums || nums.length === 0) return null;
-      return Math.min(...nums.map(Number).filter(n => !Number.isNaN(n)));
-    }
-
     function priceFilterLabel(mode, max) {
       if (mode === 'free') return 'Free only';
       if (max !== null && max !== undefined && !Number.isNaN(max)) return `<= S$${max}`;
       return 'All prices';
     }
 
-    function matchesPrice(ev, mode, max) {
-      const min = eventMinPrice(ev);
-      if (mode === 'free') return min === 0;
-      if (max !== null && max !== undefined && !Number.isNaN(max)) {
-        return min !== null && min <= max;
-      }
-      return true;
-    }
-
     function normalizeMultiSelection(values) {
       const list = Array.isArray(values) ? values : [values];
       const cleaned = Array.from(new Set(list.map(v => String(v || '').trim()).filter(Boolean)));
@@ -672,49 +794,55 @@ HTML_TEMPLATE = """<!doctype html>
       });
     }
 
-    function matchesFilter(ev, filterAges, filterCategories, filterMonth, filterLocations, filterSources, filterPriceMode, filterPriceMax) {
-      const ages = normalizeMultiSelection(filterAges);
-      const categories = normalizeMultiSelection(filterCategories);
-      const locations = normalizeMultiSelection(filterLocations);
-      const sources = normalizeMultiSelection(filterSources);
-
-      if (!ages.includes('all')) {
-        const buckets = eventBuckets(ev);
-        if (!ages.some(age => buckets.includes(age))) return false;
-      }
-      if (!categories.includes('all')) {
-        const evCategories = eventCategories(ev);
-        if (!categories.some(category => evCategories.includes(category))) return false;
-      }
-      if (filterMonth !== 'all') {
-        const span = eventMonthSpan(ev);
-        if (!span) return false;
-        if (filterMonth < span[0] || filterMonth > span[1]) return false;
-      }
-      if (!locations.includes('all') && !locations.includes(eventLocation(ev))) return false;
-      const source = String(ev.source || '').toLowerCase();
-      if (!sources.includes('all') && !sources.includes(source)) return false;
-      if (!matchesPrice(ev, filterPriceMode, filterPriceMax)) return false;
-      return true;
-    }
-
     function eventHref(ev) {
       return ev.url || ev.detail_url || '#';
     }
 
     function eventSort(a, b) {
-      const aDate = parseDateSafe(a.start);
-      const bDate = parseDateSafe(b.start);
-      if (!aDate && !bDate) return String(a.title || '').localeCompare(String(b.title || ''));
-      if (!aDate) return 1;
-      if (!bDate) return -1;
-      return aDate - bDate;
+      // The build's order: start minute (undated last), then its tie-break.
+      const aStart = a.startMinutes === null ? Infinity : a.startMinutes;
+      const bStart = b.startMinutes === null ? Infinity : b.startMinutes;
+      return (aStart - bStart) || (a.tie - b.tie);
+    }
+
+    const loadedShards = new Set();
+
+    function shardsFor(month) {
+      if (month !== 'all' && shardManifest.inline_months.includes(month)) return [];
+      return shardManifest.shards.filter(shard => {
+        if (loadedShards.has(shard.file)) return false;
+        if (month === 'all') return true;
+        return shard.last !== null && shard.key <= month && month <= shard.last;
+      });
+    }
+
+    async function loadMonth(month) {
+      const pending = shardsFor(month);
+      if (pending.length === 0) return false;
+      const results = await Promise.all(pending.map(shard => fetch(shard.file)
+        .then(res => (res.ok ? res.json() : null))
+        .catch(() => null)));
+      results.forEach((cols, idx) => {
+        if (!cols || !Array.isArray(cols.id)) return;
+        loadedShards.add(pending[idx].file);
+        addEvents(cols);
+      });
+      setupLocationFilter();
+      setupSourceFilter();
+      return true;
+    }
+
+    function showMonth(month) {
+      renderAll();
+      loadMonth(month).then(loaded => {
+        if (loaded && state.month === month) renderAll();
+      });
     }
 
     function setupMonthFilter() {
       const select = document.getElementById('month-select');
       if (!select) return;
-      const keys = allMonthKeys(events);
+      const keys = shardManifest.months;
       const current = monthKeyFromDate(new Date());
       const upcomingKeys = current ? keys.filter(k => k >= current) : keys;
       const opts = [{ value: 'all', label: 'All upcoming' }];
@@ -728,19 +856,19 @@ HTML_TEMPLATE = """<!doctype html>
       select.value = state.month;
       select.addEventListener('change', () => {
         state.month = select.value;
-        renderAll();
+        showMonth(state.month);
       });
     }
 
     function setupLocationFilter() {
-      const locations = Array.from(new Set(events.map(eventLocation))).filter(Boolean).sort((a, b) => a.localeCompare(b));
+      const locations = Array.from(facetBits.location.keys()).sort((a, b) => a.localeCompare(b));
       multiFilterMeta.location.options = [{ value: 'all', label: 'All locations' }].concat(locations.map(loc => ({ value: loc, label: loc })));
       syncSelectionWithOptions('location');
       renderMultiDropdown('location');
     }
 
     function setupSourceFilter() {
-      const sources = Array.from(new Set(events.map(ev => String(ev.source || '').toLowerCase()).filter(Boolean))).sort((a, b) => a.localeCompare(b));
+      const sources = Array.from(facetBits.source.keys()).sort((a, b) => a.localeCompare(b));
       multiFilterMeta.source.options = [{ value: 'all', label: 'All sources' }].concat(sources.map(src => ({ value: src, label: sourceLabel(src) })));
       syncSelectionWithOptions('source');
       renderMultiDropdown('source');
@@ -821,8 +949,7 @@ HTML_TEMPLATE = """<!doctype html>
     function featuredWhy(ev, weekStart, weekEnd) {
       const categories = eventCategories(ev);
       const age = bucketLabel(ev);
-      const minPrice = eventMinPrice(ev);
-      const span = eventDateSpan(ev);
+      const span = ev.days;
       let timing = 'it stands out in the upcoming mix';
       if (span) {
         if (span[0] >= weekStart && span[0] <= weekEnd) {
@@ -839,7 +966,7 @@ HTML_TEMPLATE = """<!doctype html>
       } else if (age !== 'age unknown') {
         reasons.push(`it fits the ${age} bracket`);
       }
-      if (minPrice === 0) reasons.push('entry is free');
+      if (ev.is_free) reasons.push('entry is free');
       return `${reasons.join(', ')}.`;
     }
 
@@ -848,16 +975,14 @@ HTML_TEMPLATE = """<!doctype html>
       const empty = document.getElementById('featured-empty');
       const title = document.getElementById('featured-title');
       if (!box || !empty) return;
-      const [weekStart, weekEnd] = weekWindowInSg();
+      const [startKey, endKey] = weekWindowInSg();
       if (title) {
-        title.textContent = `Featured This Week (${shortDateKey(weekStart)} - ${shortDateKey(weekEnd, true)})`;
+        title.textContent = `Featured This Week (${shortDateKey(startKey)} - ${shortDateKey(endKey, true)})`;
       }
+      const weekStart = dayNumber(startKey);
+      const weekEnd = dayNumber(endKey);
       const picked = events
-        .filter(ev => {
-          const span = eventDateSpan(ev);
-          if (!span) return false;
-          return span[0] <= weekEnd && span[1] >= weekStart;
-        })
+        .filter(ev => ev.days && ev.days[0] <= weekEnd && ev.days[1] >= weekStart)
         .sort(eventSort)
         .slice(0, 6);
 
@@ -873,7 +998,7 @@ HTML_TEMPLATE = """<!doctype html>
           return `
             <article class=\"mini-card\">
               <a class=\"mini-title\" href=\"${escapeHtml(href)}\">${escapeHtml(ev.title || 'Untitled Event')}</a>
-              <div class=\"mini-meta\">${escapeHtml(formatDateLabel(ev))}</div>
+              <div class=\"mini-meta\">${escapeHtml(ev.date_label)}</div>
               <div class=\"mini-meta\">${escapeHtml(featuredWhy(ev, weekStart, weekEnd))}</div>
               <div class=\"mini-meta\">${escapeHtml(eventLocation(ev))} · ${escapeHtml(sourceLabel(ev.source))}</div>
             </article>
@@ -900,7 +1025,7 @@ HTML_TEMPLATE = """<!doctype html>
           </div>
           <a class=\"title\" href=\"${escapeHtml(href)}\">${escapeHtml(ev.title || 'Untitled Event')}</a>
           <div class=\"meta muted\">
-            <span>${escapeHtml(formatDateLabel(ev))}</span>
+            <span>${escapeHtml(ev.date_label)}</span>
             ${venue}
             ${price}
             ${sourceUrl}
@@ -920,27 +1045,18 @@ HTML_TEMPLATE = """<!doctype html>
       const daysInMonth = new Date(Date.UTC(year, month, 0)).getUTCDate();
       const first = new Date(Date.UTC(year, month - 1, 1));
       const firstDowMonday = (first.getUTCDay() + 6) % 7;
-      const monthStart = `${year}-${String(month).padStart(2, '0')}-01`;
-      const monthEnd = `${year}-${String(month).padStart(2, '0')}-${String(daysInMonth).padStart(2, '0')}`;
+      const monthStart = year * 10000 + month * 100 + 1;
+      const monthEnd = monthStart + daysInMonth - 1;
 
       const byDay = {};
       for (let d = 1; d <= daysInMonth; d += 1) {
         byDay[d] = [];
       }
       rows.forEach(ev => {
-        const span = eventDateSpan(ev);
-        if (!span) return;
-        const start = span[0] < monthStart ? monthStart : span[0];
-        const end = span[1] > monthEnd ? monthEnd : span[1];
-        if (start > end) return;
-        let key = start;
-        while (key <= end) {
-          const day = Number(key.slice(8, 10));
-          if (byDay[day]) byDay[day].push(ev);
-          const next = addDaysKey(key, 1);
-          if (next === key) break;
-          key = next;
-        }
+        if (!ev.days) return;
+        const start = Math.max(ev.days[0], monthStart);
+        const end = Math.min(ev.days[1], monthEnd);
+        for (let key = start; key <= end; key += 1) byDay[key % 100].push(ev);
       });
 
       const names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
@@ -985,9 +1101,7 @@ HTML_TEMPLATE = """<!doctype html>
     }
 
     function renderAll() {
-      const filtered = events
-        .filter(ev => matchesFilter(ev, state.age, state.category, state.month, state.location, state.source, state.priceMode, state.maxPrice))
-        .sort(eventSort);
+      const filtered = filteredEvents();
 
       renderCards(filtered);
       renderCalendar(filtered);
@@ -1016,18 +1130,19 @@ HTML_TEMPLATE = """<!doctype html>
       view: 'cards',
     };
 
+    addEvents(__EVENTS_JSON__);
     setupMonthFilter();
     setupLocationFilter();
     setupSourceFilter();
     setupSimpleFilters();
     renderFeatured();
-    renderAll();
+    showMonth(state.month);
   </script>
 </body>
 </html>
-"""
+""")
 
-ABOUT_TEMPLATE = """<!doctype html>
+ABOUT_TEMPLATE = Template("""<!doctype html>
 <html lang=\"en\">
 <head>
   <meta charset=\"utf-8\" />
@@ -1094,10 +1209,10 @@ ABOUT_TEMPLATE = """<!doctype html>
   </div>
 </body>
 </html>
-"""
+""")
 
 
-DETAIL_TEMPLATE = """<!doctype html>
+DETAIL_TEMPLATE = Template("""<!doctype html>
 <html lang=\"en\">
 <head>
   <meta charset=\"utf-8\" />
@@ -1155,103 +1270,51 @@ DETAIL_TEMPLATE = """<!doctype html>
   </div>
 </body>
 </html>
-"""
-
-
-def load_events(path: Path) -> List[Dict[str, Any]]:
-    with path.open() as f:
-        data = json.load(f)
-    return data if isinstance(data, list) else []
+""")
+
+
+def load_events(path: Optional[Path], identities: Optional[IdentityIndex] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """Stream a JSONL (optionally gzipped) or JSON snapshot into deduped events.
+
+    Rows tagged with the current normalization version skip per-row
+    normalization; if the snapshot's checksum then fails, it is re-read and
+    normalized in full. IDs are only assigned once the rows are known good.
+    Returns the events and the raw row count.
+    """
+    if path is None:
+        return [], 0
+    reader = event_store.SnapshotReader(path)
+    trusted = reader.header.get("normalization") == NORMALIZATION_VERSION
+    events = dedupe_events(reader, normalized=trusted)
+    if trusted and not reader.intact:
+        print(f"[warn] {path} failed its checksum; normalizing every row")
+        reader = event_store.SnapshotReader(path)
+        events = dedupe_events(reader)
+    assign_identities(events, identities)
+    return events, reader.count
+
+
+# The same start/end strings come up in span, merge, sort and every view.
+@functools.lru_cache(maxsize=1 << 16)
+def _parse_iso(iso: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """``iso`` parsed, and the same instant in SG time."""
+    try:
+        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    except ValueError:
+        return None, None
+    return dt, dt.astimezone(SG_TZ)
 
 
 def _parse_dt(iso: Optional[str]) -> Optional[datetime]:
     if not iso or not isinstance(iso, str):
         return None
-    try:
-        return datetime.fromisoformat(iso.replace("Z", "+00:00"))
-    except ValueError:
-        return None
+    return _parse_iso(iso)[0]
 
 
-def _to_int_or_none(value: Any) -> Optional[int]:
-    if value is None:
-        return None
-    if isinstance(value, bool):
+def _sg_time(iso: Optional[str]) -> Optional[datetime]:
+    if not iso or not isinstance(iso, str):
         return None
-    if isinstance(value, int):
-        return value
-    if isinstance(value, float):
-        return int(value) if value.is_integer() else None
-    if isinstance(value, str):
-        txt = value.strip()
-        if re.fullmatch(r"-?\d+", txt):
-            return int(txt)
-    return None
-
-
-def _normalize_categories(value: Any) -> List[str]:
-    if not isinstance(value, list):
-        return []
-    out: List[str] = []
-    seen: set[str] = set()
-    for item in value:
-        label = str(item).strip()
-        if not label:
-            continue
-        key = label.casefold()
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(label)
-    return out
-
-
-def _normalize_age_ranges(value: Any) -> List[Tuple[Optional[int], Optional[int]]]:
-    if not isinstance(value, list):
-        return []
-    out: List[Tuple[Optional[int], Optional[int]]] = []
-    seen: set[Tuple[Optional[int], Optional[int]]] = set()
-    for item in value:
-        if not isinstance(item, (list, tuple)) or len(item) < 2:
-            continue
-        lo = _to_int_or_none(item[0])
-        hi = _to_int_or_none(item[1])
-        key = (lo, hi)
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(key)
-    return out
-
-
-def _summarize_age_ranges(ranges: List[Tuple[Optional[int], Optional[int]]]) -> Tuple[Optional[int], Optional[int]]:
-    if not ranges:
-        return None, None
-    lows = [lo for lo, _ in ranges if lo is not None]
-    highs = [hi for _, hi in ranges if hi is not None]
-    lo = min(lows) if lows else None
-    hi = None if any(hi is None for _, hi in ranges) else (max(highs) if highs else None)
-    if lo is not None and hi is not None and lo > hi:
-        lo, hi = hi, lo
-    return lo, hi
-
-
-def _canonical_event_url(url: str) -> str:
-    if not url or not isinstance(url, str):
-        return ""
-    try:
-        parts = urlsplit(url.strip())
-    except ValueError:
-        return url.strip()
-    if not parts.scheme or not parts.netloc:
-        return url.strip()
-    segments = [seg for seg in parts.path.split("/") if seg]
-    if segments and re.fullmatch(r"[a-z]{2}(?:-[a-z]{2})?", segments[0], flags=re.IGNORECASE):
-        segments = segments[1:]
-    path = "/" + "/".join(segments)
-    if path != "/":
-        path = path.rstrip("/")
-    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path or "/", "", ""))
+    return _parse_iso(iso)[1]
 
 
 def _normalize_title(title: Any) -> str:
@@ -1283,6 +1346,23 @@ def _event_signature(ev: Dict[str, Any]) -> str:
     return f"{source}|{title}|{start}|{raw_date}"
 
 
+# Rows reaching dedupe are normalized, so this mostly sees URLs it has seen.
+_canonical_url = functools.lru_cache(maxsize=1 << 16)(canonical_event_url)
+
+
+def _event_keys(ev: Dict[str, Any]) -> List[Tuple[str, str]]:
+    canonical = _canonical_url(ev.get("url") or "")
+    keys = [("url", canonical)] if canonical else []
+    keys.append(("signature", _event_signature(ev)))
+    return keys
+
+
+def _event_span(ev: Dict[str, Any]) -> Tuple[Optional[date], Optional[date]]:
+    start = _sg_time(ev.get("start"))
+    end = _sg_time(ev.get("end"))
+    return (start.date() if start else None, end.date() if end else None)
+
+
 def _merge_events(base: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
     best = base if _event_quality(base) >= _event_quality(incoming) else incoming
     other = incoming if best is base else base
@@ -1291,6 +1371,10 @@ def _merge_events(base: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, A
     for key, value in other.items():
         if merged.get(key) in (None, "", [], {}):
             merged[key] = value
+    # Parsed price fields go with the price text that was kept.
+    owner = best if best.get("price") else other
+    if owner.get("price"):
+        merged.update(zip(PRICE_FIELDS, _price_fields(owner)))
 
     base_start = _parse_dt(base.get("start"))
     inc_start = _parse_dt(incoming.get("start"))
@@ -1306,11 +1390,11 @@ def _merge_events(base: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, A
     else:
         merged["end"] = merged.get("end") or base.get("end") or incoming.get("end")
 
-    ranges = _normalize_age_ranges(base.get("age_ranges")) + _normalize_age_ranges(incoming.get("age_ranges"))
+    ranges = normalize_age_ranges(base.get("age_ranges")) + normalize_age_ranges(incoming.get("age_ranges"))
     if base.get("age_min") is not None or base.get("age_max") is not None:
-        ranges.append((_to_int_or_none(base.get("age_min")), _to_int_or_none(base.get("age_max"))))
+        ranges.append((to_int_or_none(base.get("age_min")), to_int_or_none(base.get("age_max"))))
     if incoming.get("age_min") is not None or incoming.get("age_max") is not None:
-        ranges.append((_to_int_or_none(incoming.get("age_min")), _to_int_or_none(incoming.get("age_max"))))
+        ranges.append((to_int_or_none(incoming.get("age_min")), to_int_or_none(incoming.get("age_max"))))
     dedup_ranges = []
     seen_ranges = set()
     for r in ranges:
@@ -1320,11 +1404,11 @@ def _merge_events(base: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, A
         dedup_ranges.append(r)
     if dedup_ranges:
         merged["age_ranges"] = [[lo, hi] for lo, hi in dedup_ranges]
-        lo, hi = _summarize_age_ranges(dedup_ranges)
+        lo, hi = summarize_age_ranges(dedup_ranges)
         merged["age_min"] = lo
         merged["age_max"] = hi
 
-    categories = _normalize_categories(base.get("categories")) + _normalize_categories(incoming.get("categories"))
+    categories = normalize_categories(base.get("categories")) + normalize_categories(incoming.get("categories"))
     if categories:
         uniq = []
         seen_cat = set()
@@ -1336,7 +1420,7 @@ def _merge_events(base: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, A
             uniq.append(cat)
         merged["categories"] = uniq
 
-    canonical = _canonical_event_url(merged.get("url") or "")
+    canonical = _canonical_url(merged.get("url") or "")
     if canonical:
         merged["url"] = canonical
 
@@ -1350,73 +1434,45 @@ def _event_sort_key(ev: Dict[str, Any]) -> Tuple[int, datetime, str]:
     return (0, dt, str(ev.get("title") or "").lower())
 
 
-def dedupe_and_enrich_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    normalized: List[Dict[str, Any]] = []
-    for row in events:
-        if not isinstance(row, dict):
-            continue
-        ev = dict(row)
-        ev["title"] = str(ev.get("title") or "").strip() or "Untitled Event"
-        ev["source"] = str(ev.get("source") or "").strip().lower()
-        canonical = _canonical_event_url(str(ev.get("url") or ""))
-        if canonical:
-            ev["url"] = canonical
-        ev["categories"] = _normalize_categories(ev.get("categories"))
-        ranges = _normalize_age_ranges(ev.get("age_ranges"))
-        if ranges:
-            ev["age_ranges"] = [[lo, hi] for lo, hi in ranges]
-            lo, hi = _summarize_age_ranges(ranges)
-            if ev.get("age_min") is None:
-                ev["age_min"] = lo
-            if ev.get("age_max") is None:
-                ev["age_max"] = hi
-        normalized.append(ev)
-
-    by_primary: Dict[str, Dict[str, Any]] = {}
-    for ev in normalized:
-        canonical = _canonical_event_url(ev.get("url") or "")
-        key = canonical or _event_signature(ev)
-        if key in by_primary:
-            by_primary[key] = _merge_events(by_primary[key], ev)
-        else:
-            by_primary[key] = ev
+def _identity_basis(ev: Dict[str, Any]) -> str:
+    return str(ev.get("url") or "") or _event_signature(ev)
 
-    by_signature: Dict[str, Dict[str, Any]] = {}
-    for ev in by_primary.values():
-        sig = _event_signature(ev)
-        if sig in by_signature:
-            by_signature[sig] = _merge_events(by_signature[sig], ev)
-        else:
-            by_signature[sig] = ev
-
-    deduped = sorted(by_signature.values(), key=_event_sort_key)
-
-    used_paths: set[str] = set()
-    for ev in deduped:
-        title_slug = re.sub(r"[^a-z0-9]+", "-", str(ev.get("title") or "untitled").lower()).strip("-") or "event"
-        title_slug = title_slug[:80]
-        start_tag = "tbc"
-        dt = _parse_dt(ev.get("start"))
-        if dt:
-            start_tag = dt.astimezone(SG_TZ).strftime("%Y%m%d")
-        digest_base = f"{ev.get('url','')}|{ev.get('source','')}|{ev.get('title','')}|{ev.get('start','')}"
-        digest = hashlib.sha1(digest_base.encode("utf-8")).hexdigest()[:8]
-        filename = f"{title_slug}-{start_tag}-{digest}.html"
-        detail_path = f"events/{filename}"
-        idx = 2
-        while detail_path in used_paths:
-            detail_path = f"events/{title_slug}-{start_tag}-{digest}-{idx}.html"
-            idx += 1
-        used_paths.add(detail_path)
-        ev["detail_url"] = detail_path
 
+def dedupe_events(events: Iterable[Dict[str, Any]], normalized: bool = False) -> List[Dict[str, Any]]:
+    """Merge duplicate rows, in event order.
+
+    ``normalized`` rows come from a trusted snapshot already passed through
+    ``event_schema.normalize_row``.
+    """
+    if normalized:
+        rows = [row for row in events if isinstance(row, dict)]
+    else:
+        rows = [normalize_row(row) for row in events if isinstance(row, dict)]
+
+    clusters = cluster(rows, keys=_event_keys, title=lambda ev: str(ev.get("title") or ""), span=_event_span)
+    return sorted((functools.reduce(_merge_events, members) for members in clusters), key=_event_sort_key)
+
+
+def assign_identities(events: List[Dict[str, Any]], identities: Optional[IdentityIndex] = None):
+    """Give ``events`` stable IDs and detail pages from ``identities``, or a fresh in-memory index."""
+    (identities or IdentityIndex()).assign(events, span=_event_span, basis=_identity_basis)
+
+
+def dedupe_and_enrich_events(
+    events: Iterable[Dict[str, Any]],
+    normalized: bool = False,
+    identities: Optional[IdentityIndex] = None,
+) -> List[Dict[str, Any]]:
+    """Merge duplicate rows and assign stable IDs and detail pages."""
+    deduped = dedupe_events(events, normalized=normalized)
+    assign_identities(deduped, identities)
     return deduped
 
 
-def source_summary(events: List[Dict[str, Any]]) -> str:
+def source_summary(views: List["EventView"]) -> str:
     seen: List[str] = []
-    for ev in events:
-        src = str(ev.get("source") or "").strip().lower()
+    for view in views:
+        src = view.source
         if src and src not in seen:
             seen.append(src)
     labels = [SOURCE_LABELS.get(src, src.title()) for src in seen]
@@ -1428,33 +1484,33 @@ def scraped_places_summary() -> str:
     return ", ".join(labels)
 
 
-def _event_date_label(ev: Dict[str, Any]) -> str:
-    start = _parse_dt(ev.get("start"))
-    end = _parse_dt(ev.get("end"))
+def _date_label(start: Optional[datetime], end: Optional[datetime], raw_date: Any) -> str:
+    """Label for SG-local ``start``/``end``."""
 
-    def fmt(d: datetime) -> str:
-        local = d.astimezone(SG_TZ)
+    def fmt(local: datetime) -> str:
         if local.hour == 0 and local.minute == 0:
             return local.strftime("%d %b %Y")
         return local.strftime("%d %b %Y %I:%M %p")
 
     if start and end:
-        s = start.astimezone(SG_TZ)
-        e = end.astimezone(SG_TZ)
-        if s.date() == e.date():
+        if start.date() == end.date():
             return f"On {fmt(start)}"
         return f"Runs {fmt(start)} to {fmt(end)}"
     if start:
         return f"From {fmt(start)}"
-    raw = str(ev.get("raw_date") or "").strip()
+    raw = str(raw_date or "").strip()
     return f"Dates: {raw}" if raw else "Date TBC"
 
 
+def _event_date_label(ev: Dict[str, Any]) -> str:
+    return _date_label(_sg_time(ev.get("start")), _sg_time(ev.get("end")), ev.get("raw_date"))
+
+
 def _age_label(ev: Dict[str, Any]) -> str:
-    ranges = _normalize_age_ranges(ev.get("age_ranges"))
+    ranges = normalize_age_ranges(ev.get("age_ranges"))
     if not ranges:
-        lo = _to_int_or_none(ev.get("age_min"))
-        hi = _to_int_or_none(ev.get("age_max"))
+        lo = to_int_or_none(ev.get("age_min"))
+        hi = to_int_or_none(ev.get("age_max"))
         ranges = [(lo, hi)] if lo is not None or hi is not None else []
     if not ranges:
         return "Age not specified"
@@ -1471,88 +1527,342 @@ def _age_label(ev: Dict[str, Any]) -> str:
     return ", ".join(labels)
 
 
-def render_html(events: List[Dict[str, Any]]) -> str:
-    events_json = (
-        json.dumps(events)
+@dataclass(frozen=True)
+class EventView:
+    """What the renderers need from one event, worked out once per build."""
+
+    event: Dict[str, Any]
+    title: str
+    source: str
+    source_label: str
+    url: str
+    detail_url: str
+    venue: str
+    price: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    categories: Tuple[str, ...]
+    date_label: str
+    age_label: str
+    price_min: Optional[float]
+    is_free: bool
+    # Order among events with the same start minute (or among undated ones).
+    tie: int = 0
+
+    @property
+    def description(self) -> str:
+        parts = [self.venue, self.price, self.age_label, ", ".join(self.categories), self.date_label]
+        return " | ".join([p for p in parts if p])
+
+
+def event_view(ev: Dict[str, Any], tie: int = 0) -> EventView:
+    source = str(ev.get("source") or "")
+    start = _sg_time(ev.get("start"))
+    end = _sg_time(ev.get("end"))
+    price_min, _, _, is_free = _price_fields(ev)
+    return EventView(
+        event=ev,
+        title=str(ev.get("title") or ""),
+        source=source.strip().lower(),
+        source_label=SOURCE_LABELS.get(source, (source or "Unknown source").title()),
+        url=str(ev.get("url") or ""),
+        detail_url=str(ev.get("detail_url") or "").strip(),
+        venue=str(ev.get("venue") or "").strip(),
+        price=str(ev.get("price") or "").strip(),
+        start=start,
+        end=end,
+        categories=tuple(normalize_categories(ev.get("categories"))),
+        date_label=_date_label(start, end, ev.get("raw_date")),
+        age_label=_age_label(ev),
+        price_min=price_min,
+        is_free=bool(is_free),
+        tie=tie,
+    )
+
+
+def _sort_ties(events: List[Dict[str, Any]]) -> List[int]:
+    """Each event's place among those sharing its start minute, for events in ``_event_sort_key`` order.
+
+    The page sorts by start minute and then this, which reproduces the
+    build's order without comparing titles or dates as text.
+    """
+    ties: List[int] = []
+    previous: Any = object()
+    for ev in events:
+        minute = _epoch_minutes(_parse_dt(ev.get("start")))
+        ties.append(ties[-1] + 1 if ties and minute == previous else 0)
+        previous = minute
+    return ties
+
+
+def _script_json(value: Any) -> Raw:
+    """``value`` as JSON that is safe inside a <script> element."""
+    return Raw(
+        json.dumps(value)
         .replace("<", "\\u003c")
         .replace(">", "\\u003e")
         .replace("&", "\\u0026")
     )
-    return (
-        HTML_TEMPLATE.replace("__SITE_TITLE__", SITE_TITLE)
-        .replace("__SITE_DESC__", SITE_DESC)
-        .replace("__SCRAPED_PLACES__", scraped_places_summary())
-        .replace("__SOURCE_SUMMARY__", source_summary(events))
-        .replace("__UPDATED_AT__", datetime.now(tz=SG_TZ).strftime("%d %b %Y, %H:%M SGT"))
-        .replace("__SOURCE_LABELS_JSON__", json.dumps(SOURCE_LABELS))
-        .replace("__EVENTS_JSON__", events_json)
+
+
+def render_html(views: List[EventView], manifest: Dict[str, Any]) -> str:
+    return HTML_TEMPLATE.render(
+        SITE_TITLE=SITE_TITLE,
+        SITE_DESC=SITE_DESC,
+        SOURCE_LABELS_JSON=_script_json(SOURCE_LABELS),
+        EVENTS_JSON=_script_json(encode_events(views)),
+        SHARDS_JSON=_script_json(manifest),
+    )
+
+
+def _day_number(day: date) -> int:
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def _day_span(view: EventView) -> Optional[Tuple[date, date]]:
+    """SG dates an event covers, as the client computes them (either end stands in for the other)."""
+    first = view.start or view.end
+    last = view.end or view.start
+    if first is None or last is None:
+        return None
+    a, b = sorted((first.date(), last.date()))
+    return a, b
+
+
+def _month_keys(first: date, last: date) -> List[str]:
+    keys = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def _age_ranges(ev: Dict[str, Any]) -> List[List[Optional[int]]]:
+    ranges = normalize_age_ranges(ev.get("age_ranges"))
+    if not ranges:
+        lo = to_int_or_none(ev.get("age_min"))
+        hi = to_int_or_none(ev.get("age_max"))
+        ranges = [(lo, hi)] if lo is not None or hi is not None else []
+    return [[lo, hi] for lo, hi in ranges]
+
+
+def _age_buckets(ranges: List[List[Optional[int]]]) -> List[str]:
+    buckets = []
+    for bucket, (b_lo, b_hi) in AGE_BUCKETS.items():
+        for lo, hi in ranges:
+            if (0 if lo is None else lo) <= b_hi and (99 if hi is None else hi) >= b_lo:
+                buckets.append(bucket)
+                break
+    return buckets
+
+
+def _price_fields(ev: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], Optional[str], Optional[bool]]:
+    """``PRICE_FIELDS`` of a row, parsed from ``price`` in snapshots written before scrapes set them."""
+    if "is_free" in ev:
+        return tuple(ev.get(key) for key in PRICE_FIELDS)
+    return parse_price(ev.get("price"))
+
+
+def _price_band(low: Optional[float]) -> Optional[str]:
+    if low is None:
+        return None
+    for upper in PRICE_BANDS:
+        if low <= upper:
+            return str(upper)
+    return "more"
+
+
+def _location(view: EventView) -> str:
+    return view.venue or SOURCE_LABELS.get(view.source) or view.source or "Unknown source"
+
+
+def _epoch_minutes(dt: Optional[datetime]) -> Optional[int]:
+    return int(dt.timestamp()) // 60 if dt else None
+
+
+def _derived_page(title: str, start_minutes: Optional[int], eid: Any) -> str:
+    """Detail path as the page script rebuilds it: slug, SG start day (UTC+8, no DST) and ID."""
+    tag = "tbc"
+    if start_minutes is not None:
+        tag = (datetime(1970, 1, 1) + timedelta(minutes=start_minutes + 480)).strftime("%Y%m%d")
+    return f"events/{slugify(title)}-{tag}-{eid}.html"
+
+
+def encode_events(views: List[EventView]) -> Dict[str, Any]:
+    """The fields the index page uses, as parallel arrays.
+
+    ``source``, ``venue``, ``categories``, ``date_label`` and ``url_base``
+    (a URL up to its last ``/``) index into ``dict``. ``start`` is minutes
+    since the epoch and ``tie`` the view's ``tie``, which together sort
+    events. ``days`` is the first and last SG day covered as YYYYMMDD
+    integers (null when undated). ``page`` is null when ``detail_url``
+    follows from title, start and ID, "" when there is none. Everything else
+    stays on the detail pages; ``decodeEvents`` in the page script turns
+    this back into objects.
+
+    ``facets`` maps each filter (age, category, month, location, source,
+    price band, free) to value -> sorted row indexes, and ``price_min`` holds
+    the number the max-price filter compares, so the page filters with
+    bitsets. ``is_free`` is 1 for events free for everyone, else 0.
+    """
+    tables: Dict[str, Dict[str, int]] = {"source": {}, "venue": {}, "category": {}, "url": {}, "label": {}}
+
+    def code(table: str, value: str) -> int:
+        return tables[table].setdefault(value, len(tables[table]))
+
+    names = (
+        "id", "title", "url_base", "url", "page", "start", "tie", "days", "date_label",
+        "source", "venue", "price", "price_min", "is_free", "categories", "ages",
     )
+    columns: Dict[str, List[Any]] = {name: [] for name in names}
+    facets: Dict[str, Dict[str, List[int]]] = {
+        name: {} for name in ("age", "category", "month", "location", "source", "price", "free")
+    }
+
+    def post(facet: str, value: Optional[str], row: int):
+        if value:
+            facets[facet].setdefault(value, []).append(row)
+
+    for row, view in enumerate(views):
+        ev = view.event
+        eid = ev.get("id")
+        start = _epoch_minutes(view.start)
+        span = _day_span(view)
+        cut = view.url.rfind("/") + 1
+        page: Optional[str] = view.detail_url
+        if not page:
+            page = ""
+        elif view.title.isascii() and page == _derived_page(view.title, start, eid):
+            page = None
+        columns["id"].append(eid)
+        columns["title"].append(view.title)
+        columns["url_base"].append(code("url", view.url[:cut]) if view.url else None)
+        columns["url"].append(view.url[cut:] if view.url else None)
+        columns["page"].append(page)
+        columns["start"].append(start)
+        columns["tie"].append(view.tie)
+        columns["days"].append([_day_number(day) for day in span] if span else None)
+        columns["date_label"].append(code("label", view.date_label))
+        columns["source"].append(code("source", view.source))
+        columns["venue"].append(code("venue", view.venue) if view.venue else None)
+        columns["price"].append(view.price or None)
+        columns["categories"].append([code("category", cat) for cat in view.categories])
+        ranges = _age_ranges(ev)
+        columns["ages"].append(ranges)
+        columns["price_min"].append(view.price_min)
+        columns["is_free"].append(1 if view.is_free else 0)
+
+        for bucket in _age_buckets(ranges):
+            post("age", bucket, row)
+        for cat in view.categories:
+            post("category", cat, row)
+        for month in _month_keys(*span) if span else []:
+            post("month", month, row)
+        post("location", _location(view), row)
+        post("source", view.source, row)
+        post("price", _price_band(view.price_min), row)
+        post("free", "free" if view.is_free else None, row)
+    return {
+        "count": len(views),
+        "dict": {name: list(values) for name, values in tables.items()},
+        **columns,
+        "facets": facets,
+    }
 
 
-def render_about(events: List[Dict[str, Any]], raw_count: int) -> str:
-    return (
-        ABOUT_TEMPLATE.replace("__SITE_TITLE__", SITE_TITLE)
-        .replace("__SCRAPED_PLACES__", scraped_places_summary())
-        .replace("__SOURCE_SUMMARY__", source_summary(events))
-        .replace("__RAW_COUNT__", str(raw_count))
-        .replace("__DEDUPED_COUNT__", str(len(events)))
+@dataclass(frozen=True)
+class Shard:
+    key: str
+    path: str
+    text: str
+    last: Optional[str]
+    count: int
+
+
+def shard_events(views: List[EventView], today: date) -> Tuple[List[Shard], Dict[str, Any], List[EventView]]:
+    """Split events into shards by SG start month, for the index page to load lazily.
+
+    Returns the shard files (named by a hash of their content), the manifest
+    the client picks shards from, and the events index.html inlines: those
+    overlapping this week, this month or next month.
+    """
+    this_month = today.replace(day=1)
+    next_month = (this_month + timedelta(days=32)).replace(day=1)
+    window_start = min(this_month, today - timedelta(days=today.weekday()))
+    window_end = (next_month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    grouped: Dict[str, List[EventView]] = {}
+    reach: Dict[str, str] = {}
+    months: set[str] = set()
+    inline: List[EventView] = []
+    for view in views:
+        span = _day_span(view)
+        if span is None:
+            grouped.setdefault(UNDATED_SHARD, []).append(view)
+            continue
+        keys = _month_keys(*span)
+        months.update(keys)
+        grouped.setdefault(keys[0], []).append(view)
+        reach[keys[0]] = max(reach.get(keys[0], keys[-1]), keys[-1])
+        if span[0] <= window_end and span[1] >= window_start:
+            inline.append(view)
+
+    shards = []
+    for key in sorted(grouped):
+        text = json.dumps(encode_events(grouped[key]), separators=(",", ":"))
+        path = f"data/events-{key}.{input_hash(text)[:10]}.json"
+        shards.append(Shard(key=key, path=path, text=text, last=reach.get(key), count=len(grouped[key])))
+    manifest = {
+        "months": sorted(months),
+        "inline_months": [_month_keys(this_month, this_month)[0], _month_keys(next_month, next_month)[0]],
+        # A shard holds events starting in ``key``; ``last`` is the latest month any of them reaches.
+        "shards": [
+            {"key": shard.key, "file": shard.path, "last": shard.last, "count": shard.count}
+            for shard in shards
+        ],
+    }
+    return shards, manifest, inline
+
+
+def render_about(views: List[EventView], raw_count: int) -> str:
+    return ABOUT_TEMPLATE.render(
+        SITE_TITLE=SITE_TITLE,
+        SCRAPED_PLACES=scraped_places_summary(),
+        SOURCE_SUMMARY=source_summary(views),
+        RAW_COUNT=raw_count,
+        DEDUPED_COUNT=len(views),
     )
 
 
-def render_event_page(ev: Dict[str, Any]) -> str:
-    title = escape(str(ev.get("title") or "Untitled Event"))
-    source = escape(SOURCE_LABELS.get(str(ev.get("source") or ""), str(ev.get("source") or "Unknown source").title()))
-    source_url = escape(str(ev.get("url") or "#"))
-    date_label = escape(_event_date_label(ev))
-    venue = escape(str(ev.get("venue") or "Not specified"))
-    price = escape(str(ev.get("price") or "Not specified"))
-    age = escape(_age_label(ev))
-    categories = ", ".join(_normalize_categories(ev.get("categories"))) or "Uncategorized"
-    categories = escape(categories)
-    canonical = escape(BASE_URL.rstrip("/") + "/" + str(ev.get("detail_url") or ""))
-
-    desc_parts = [
-        str(ev.get("venue") or "").strip(),
-        str(ev.get("price") or "").strip(),
-        _age_label(ev),
-        ", ".join(_normalize_categories(ev.get("categories"))),
-        _event_date_label(ev),
-    ]
-    description = escape(" | ".join([p for p in desc_parts if p]))
-
-    pills = []
-    for cat in _normalize_categories(ev.get("categories")):
-        pills.append(f'<span class="pill">{escape(cat)}</span>')
-    pills.append(f'<span class="pill">{source}</span>')
-    pills_html = "".join(pills)
-
-    return (
-        DETAIL_TEMPLATE.replace("__TITLE__", title)
-        .replace("__SITE_TITLE__", SITE_TITLE)
-        .replace("__DESCRIPTION__", description)
-        .replace("__CANONICAL__", canonical)
-        .replace("__SOURCE__", source)
-        .replace("__DATE_LABEL__", date_label)
-        .replace("__VENUE__", venue)
-        .replace("__PRICE__", price)
-        .replace("__AGE__", age)
-        .replace("__CATEGORIES__", categories)
-        .replace("__PILLS__", pills_html)
-        .replace("__SOURCE_URL__", source_url)
+def render_event_page(view: EventView) -> str:
+    pills = [f'<span class="pill">{escape(cat)}</span>' for cat in view.categories]
+    pills.append(f'<span class="pill">{escape(view.source_label)}</span>')
+
+    return DETAIL_TEMPLATE.render(
+        TITLE=view.title or "Untitled Event",
+        SITE_TITLE=SITE_TITLE,
+        DESCRIPTION=view.description,
+        CANONICAL=BASE_URL.rstrip("/") + "/" + view.detail_url,
+        SOURCE=view.source_label,
+        DATE_LABEL=view.date_label,
+        VENUE=str(view.event.get("venue") or "Not specified"),
+        PRICE=str(view.event.get("price") or "Not specified"),
+        AGE=view.age_label,
+        CATEGORIES=", ".join(view.categories) or "Uncategorized",
+        PILLS=Raw("".join(pills)),
+        SOURCE_URL=view.url or "#",
     )
 
 
-def render_rss(events: List[Dict[str, Any]]) -> str:
+def render_rss(views: List[EventView]) -> str:
     now = datetime.now(tz=SG_TZ)
     items = []
-    for ev in events:
-        start = str(ev.get("start") or "")
-        title = escape(str(ev.get("title") or "Event"))
-        detail_url = str(ev.get("detail_url") or "").strip()
-        link = BASE_URL.rstrip("/") + "/" + detail_url if detail_url else str(ev.get("url") or "")
-        age = _age_label(ev)
-        category_text = ", ".join(_normalize_categories(ev.get("categories")))
-        desc_parts = [str(ev.get("venue") or ""), str(ev.get("price") or ""), age, category_text]
+    for view in views:
+        start = str(view.event.get("start") or "")
+        title = escape(view.title or "Event")
+        link = BASE_URL.rstrip("/") + "/" + view.detail_url if view.detail_url else view.url
+        desc_parts = [view.venue, view.price, view.age_label, ", ".join(view.categories)]
         description = escape(" | ".join([p for p in desc_parts if p]))
         items.append(
             f"""
@@ -1578,30 +1888,54 @@ def render_rss(events: List[Dict[str, Any]]) -> str:
 """
 
 
-def build(output_dir: Path = Path("site")):
-    data_path = Path("data/events.json")
-    raw_data = load_events(data_path) if data_path.exists() else []
-    events = dedupe_and_enrich_events(raw_data)
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-    (output_dir / "index.html").write_text(render_html(events), encoding="utf-8")
-    (output_dir / "about.html").write_text(render_about(events, len(raw_data)), encoding="utf-8")
-    (output_dir / "rss.xml").write_text(render_rss(events), encoding="utf-8")
-    (output_dir / "events.json").write_text(json.dumps(events, indent=2), encoding="utf-8")
-
-    for ev in events:
-        detail_url = str(ev.get("detail_url") or "").strip()
-        if not detail_url:
-            continue
-        out_path = output_dir / detail_url
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(render_event_page(ev), encoding="utf-8")
-
-    print(f"Built site with {len(events)} events ({len(raw_data)} raw) -> {output_dir}")
+def _event_hash(ev: Dict[str, Any]) -> str:
+    return input_hash(json.dumps(ev, sort_keys=True))
+
+
+def build(output_dir: Path = Path("site"), full: bool = False, jobs: int = 1):
+    identities = IdentityIndex.load(IDENTITY_PATH)
+    events, raw_count = load_events(event_store.find_snapshot(Path("data/events")), identities)
+    identities.save()
+
+    # Any change to the rendering code re-renders every page.
+    renderer = file_hash([Path(__file__), Path(event_schema.__file__), Path(__file__).with_name("template.py")])
+    writer = SiteWriter(output_dir, renderer, full=full)
+    views = [event_view(ev, tie) for ev, tie in zip(events, _sort_ties(events))]
+    event_hashes = [_event_hash(ev) for ev in events]
+    all_events = input_hash(*event_hashes)
+    shards, manifest, inline = shard_events(views, datetime.now(tz=SG_TZ).date())
+    for shard in shards:
+        writer.write(shard.path, input_hash(shard.text), lambda shard=shard: shard.text)
+    manifest_json = json.dumps(manifest, indent=2)
+    writer.write("data/manifest.json", input_hash(manifest_json), lambda: manifest_json)
+    index_key = input_hash(manifest_json, *(f"{view.tie}:{_event_hash(view.event)}" for view in inline))
+    writer.write("index.html", index_key, lambda: render_html(inline, manifest))
+    writer.write("about.html", input_hash(all_events, str(raw_count)), lambda: render_about(views, raw_count))
+    writer.write("rss.xml", all_events, lambda: render_rss(views))
+    writer.write("events.json", all_events, lambda: json.dumps(events, indent=2))
+
+    pages = [(view.detail_url, key, view) for view, key in zip(views, event_hashes) if view.detail_url]
+    writer.write_all(pages, render_event_page, jobs=jobs)
+    writer.prune("events/*.html", "data/events-*.json")
+    writer.save()
+
+    print(
+        f"Built site with {len(events)} events ({raw_count} raw, {identities.issued} new IDs) -> {output_dir}: "
+        f"{writer.summary()}"
+    )
 
 
 def main():
-    build()
+    parser = argparse.ArgumentParser(description="Build the static site from the events snapshot")
+    parser.add_argument("--full", action="store_true", help="re-render every page, ignoring the build manifest")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes rendering detail pages (default: CPU count; 1 renders serially)",
+    )
+    args = parser.parse_args()
+    build(full=args.full, jobs=args.jobs)
 
 
 if __name__ == "__main__":
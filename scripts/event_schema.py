@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# Version of the per-row normalization below. Snapshots tagged with it are
+# loaded by build_site.py without normalizing each row again; bump it when
+# normalize_row (or a helper) changes.
+NORMALIZATION_VERSION = 1
+
+
+def to_int_or_none(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        txt = value.strip()
+        if re.fullmatch(r"-?\d+", txt):
+            return int(txt)
+    return None
+
+
+def normalize_categories(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    out: List[str] = []
+    seen: set[str] = set()
+    for item in value:
+        label = str(item).strip()
+        if not label:
+            continue
+        key = label.casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(label)
+    return out
+
+
+def normalize_age_ranges(value: Any) -> List[Tuple[Optional[int], Optional[int]]]:
+    if not isinstance(value, list):
+        return []
+    out: List[Tuple[Optional[int], Optional[int]]] = []
+    seen: set[Tuple[Optional[int], Optional[int]]] = set()
+    for item in value:
+        if not isinstance(item, (list, tuple)) or len(item) < 2:
+            continue
+        lo = to_int_or_none(item[0])
+        hi = to_int_or_none(item[1])
+        key = (lo, hi)
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(key)
+    return out
+
+
+def summarize_age_ranges(ranges: List[Tuple[Optional[int], Optional[int]]]) -> Tuple[Optional[int], Optional[int]]:
+    if not ranges:
+        return None, None
+    lows = [lo for lo, _ in ranges if lo is not None]
+    highs = [hi for _, hi in ranges if hi is not None]
+    lo = min(lows) if lows else None
+    hi = None if any(hi is None for _, hi in ranges) else (max(highs) if highs else None)
+    if lo is not None and hi is not None and lo > hi:
+        lo, hi = hi, lo
+    return lo, hi
+
+
+def canonical_event_url(url: str) -> str:
+    if not url or not isinstance(url, str):
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    if not parts.scheme or not parts.netloc:
+        return url.strip()
+    segments = [seg for seg in parts.path.split("/") if seg]
+    if segments and re.fullmatch(r"[a-z]{2}(?:-[a-z]{2})?", segments[0], flags=re.IGNORECASE):
+        segments = segments[1:]
+    path = "/" + "/".join(segments)
+    if path != "/":
+        path = path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path or "/", "", ""))
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    ev = dict(row)
+    ev["title"] = str(ev.get("title") or "").strip() or "Untitled Event"
+    ev["source"] = str(ev.get("source") or "").strip().lower()
+    canonical = canonical_event_url(str(ev.get("url") or ""))
+    if canonical:
+        ev["url"] = canonical
+    ev["categories"] = normalize_categories(ev.get("categories"))
+    ranges = normalize_age_ranges(ev.get("age_ranges"))
+    if ranges:
+        ev["age_ranges"] = [[lo, hi] for lo, hi in ranges]
+        lo, hi = summarize_age_ranges(ranges)
+        if ev.get("age_min") is None:
+            ev["age_min"] = lo
+        if ev.get("age_max") is None:
+            ev["age_max"] = hi
+    return ev
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional
+
+# Bump when the layout of event rows changes incompatibly.
+SCHEMA_VERSION = 1
+
+# Snapshot variants of one stem (e.g. data/events), by format name.
+SUFFIXES = {
+    "jsonl.gz": ".jsonl.gz",
+    "jsonl": ".jsonl",
+    "json": ".json",
+}
+
+
+def snapshot_path(stem: Path, fmt: str) -> Path:
+    return stem.with_name(stem.name + SUFFIXES[fmt])
+
+
+def find_snapshot(stem: Path) -> Optional[Path]:
+    """The most recently written snapshot for ``stem``, in any format."""
+    existing = [snapshot_path(stem, fmt) for fmt in SUFFIXES]
+    existing = [path for path in existing if path.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda path: path.stat().st_mtime)
+
+
+def _is_jsonl(path: Path) -> bool:
+    return path.name.endswith((".jsonl", ".jsonl.gz"))
+
+
+def _open(path: Path, mode: str, compressed: Optional[bool] = None) -> IO[str]:
+    if compressed is None:
+        compressed = path.name.endswith(".gz")
+    if compressed:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+class EventWriter:
+    """JSONL snapshot writer: a header record, one compact event per line, then
+    a trailer with the row count and a SHA-256 over the header and rows.
+
+    Rows can be appended in batches as they become available (e.g. per
+    source); ``path`` is only replaced once the writer closes cleanly.
+    """
+
+    def __init__(self, path: Path, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = path.with_name(path.name + ".tmp")
+        self._file = _open(self._tmp, "w", compressed=path.name.endswith(".gz"))
+        self._digest = hashlib.sha256()
+        self._write_line({"type": "header", "schema": SCHEMA_VERSION, **(meta or {})})
+
+    def _write_line(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(",", ":"))
+        self._digest.update(line.encode("utf-8"))
+        self._file.write(line + "\n")
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        written = 0
+        for row in rows:
+            self._write_line(row)
+            written += 1
+        self.count += written
+        return written
+
+    def close(self):
+        trailer = {"type": "trailer", "count": self.count, "sha256": self._digest.hexdigest()}
+        self._file.write(json.dumps(trailer, separators=(",", ":")) + "\n")
+        self._file.close()
+        self._tmp.replace(self.path)
+
+    def discard(self):
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "EventWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_events(path: Path, rows: Iterable[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> int:
+    """Write a snapshot in the format implied by ``path``; ``.json`` is pretty-printed."""
+    if _is_jsonl(path):
+        with EventWriter(path, meta) as writer:
+            writer.append(rows)
+        return writer.count
+    rows = list(rows)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    tmp.replace(path)
+    return len(rows)
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """Header record of a JSONL snapshot; plain JSON arrays have none."""
+    if not _is_jsonl(path):
+        return {}
+    with _open(path, "r") as f:
+        first = f.readline()
+    try:
+        header = json.loads(first) if first.strip() else {}
+    except json.JSONDecodeError:
+        return {}
+    return header if isinstance(header, dict) and header.get("type") == "header" else {}
+
+
+class SnapshotReader:
+    """Streams rows from a snapshot in any format.
+
+    JSONL is read one line at a time; a JSON array has to be loaded whole.
+    Once iteration finishes, ``intact`` says whether the JSONL trailer matched
+    what was read (always False for JSON arrays, which carry no checksum).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.header = read_header(path)
+        self.count = 0
+        self.intact = False
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.count = 0
+        self.intact = False
+        if not _is_jsonl(self.path):
+            with self.path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            for row in data if isinstance(data, list) else []:
+                self.count += 1
+                yield row
+            return
+        digest = hashlib.sha256()
+        trailer = None
+        with _open(self.path, "r") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                kind = row.get("type") if isinstance(row, dict) else None
+                if kind == "trailer":
+                    trailer = row
+                    continue
+                digest.update(line.encode("utf-8"))
+                if kind == "header":
+                    schema = row.get("schema")
+                    if schema != SCHEMA_VERSION:
+                        raise ValueError(f"{self.path} has snapshot schema {schema}, expected {SCHEMA_VERSION}")
+                    continue
+                self.count += 1
+                yield row
+        self.intact = (
+            trailer is not None
+            and trailer.get("count") == self.count
+            and trailer.get("sha256") == digest.hexdigest()
+        )
+
+
+def iter_events(path: Path) -> Iterator[Dict[str, Any]]:
+    return iter(SnapshotReader(path))
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sources.clustering import Span, cluster
+
+INDEX_VERSION = 1
+ID_LENGTH = 10
+# Entries for events that stopped appearing are kept this long, so an event
+# that drops off a listing for a while comes back under its old ID.
+KEEP_UNSEEN_DAYS = 180
+
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(title: Any) -> str:
+    slug = SLUG_RE.sub("-", str(title or "untitled").lower()).strip("-") or "event"
+    return slug[:80]
+
+
+def _parse_day(value: Any) -> Optional[date]:
+    try:
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class IdentityIndex:
+    """Stable IDs and detail page paths for deduped events, kept across builds.
+
+    An event takes over the entry it matches, by canonical URL or else by a
+    near-identical title in overlapping dates (the dedupe engine's rules),
+    so retitled or rescheduled events keep their ID. The detail path is
+    fixed when an ID is first issued.
+    """
+
+    def __init__(self, path: Optional[Path] = None, entries: Optional[dict] = None):
+        self.path = path
+        self.entries: Dict[str, dict] = entries or {}
+        self.issued = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "IdentityIndex":
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries") or {})
+
+    def save(self):
+        if self.path is None:
+            return
+        cutoff = (date.today() - timedelta(days=KEEP_UNSEEN_DAYS)).isoformat()
+        entries = {k: v for k, v in self.entries.items() if v.get("seen", "") >= cutoff}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "entries": entries}, f)
+        tmp.replace(self.path)
+
+    def _entry_span(self, entry: dict) -> Span:
+        return _parse_day(entry.get("start")), _parse_day(entry.get("end"))
+
+    def assign(
+        self,
+        events: List[Dict[str, Any]],
+        span: Callable[[Dict[str, Any]], Span],
+        basis: Callable[[Dict[str, Any]], str],
+    ):
+        """Set ``id`` and ``detail_url`` on each event.
+
+        ``events`` must already be deduped. ``basis`` gives the text a new ID
+        is hashed from (e.g. canonical URL or signature), so a new event gets
+        the same ID whatever order it is processed in.
+        """
+        entry_ids = list(self.entries)
+        records: List[tuple] = [
+            (entry.get("urls") or [], entry.get("title") or "", self._entry_span(entry))
+            for entry in self.entries.values()
+        ]
+        spans = [span(ev) for ev in events]
+        records += [
+            ([ev["url"]] if ev.get("url") else [], str(ev.get("title") or ""), spans[i])
+            for i, ev in enumerate(events)
+        ]
+        offset = len(entry_ids)
+
+        if not entry_ids:
+            # Nothing to match against (first build, or no index given).
+            groups = [[i] for i in range(len(records))]
+        else:
+            groups = cluster(
+                list(range(len(records))),
+                keys=lambda i: [("url", url) for url in records[i][0]],
+                title=lambda i: records[i][1],
+                span=lambda i: records[i][2],
+            )
+        for members in groups:
+            free = [entry_ids[i] for i in members if i < offset]
+            pending: List[int] = []
+            for i in members:
+                if i < offset:
+                    continue
+                url = events[i - offset].get("url")
+                owner = next((eid for eid in free if url and url in self.entries[eid].get("urls", [])), None)
+                if owner is None:
+                    pending.append(i - offset)
+                    continue
+                free.remove(owner)
+                self._claim(owner, events[i - offset], spans[i - offset])
+            for j in pending:
+                if free:
+                    # Prefer an entry with the same start day, then index order.
+                    start = spans[j][0]
+                    owner = min(free, key=lambda eid: self._entry_span(self.entries[eid])[0] != start)
+                    free.remove(owner)
+                else:
+                    owner = self._issue(events[j], basis(events[j]), spans[j])
+                self._claim(owner, events[j], spans[j])
+
+    def _issue(self, ev: Dict[str, Any], basis: str, span: Span) -> str:
+        digest = hashlib.sha1(basis.encode("utf-8")).hexdigest()
+        eid = digest[:ID_LENGTH]
+        idx = 2
+        while eid in self.entries:
+            eid = f"{digest[:ID_LENGTH]}-{idx}"
+            idx += 1
+        start_tag = span[0].strftime("%Y%m%d") if span[0] else "tbc"
+        self.entries[eid] = {"urls": [], "path": f"events/{slugify(ev.get('title'))}-{start_tag}-{eid}.html"}
+        self.issued += 1
+        return eid
+
+    def _claim(self, eid: str, ev: Dict[str, Any], span: Span):
+        entry = self.entries[eid]
+        url = ev.get("url")
+        if url and url not in entry["urls"]:
+            entry["urls"].append(url)
+        entry["title"] = str(ev.get("title") or "")
+        entry["start"] = span[0].isoformat() if span[0] else None
+        entry["end"] = span[1].isoformat() if span[1] else None
+        entry["seen"] = date.today().isoformat()
+        ev["id"] = eid
+        ev["detail_url"] = entry["path"]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from scrape import SHARDS_DIR, add_format_arguments, merge_partials, save_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge shard snapshots from scrape.py --shard into data/events.jsonl")
+    parser.add_argument("paths", nargs="*", type=Path, help=f"shard snapshots (default: {SHARDS_DIR}/shard-*.jsonl.gz)")
+    add_format_arguments(parser)
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(SHARDS_DIR.glob("shard-*.jsonl.gz"))
+    if not paths:
+        parser.error(f"no shard snapshots found in {SHARDS_DIR}")
+    try:
+        events = merge_partials(paths)
+    except ValueError as exc:
+        parser.error(str(exc))
+    path = save_events(events, fmt=args.format)
+    print(f"Merged {len(paths)} shard snapshots into {len(events)} events in {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,361 @@
 from __future__ import annotations
 
-import json
+import argparse
+import time
+from collections import Counter
 from pathlib import Path
-from typing import List
-
-from sources import artshouse, cultural_centres, esplanade, gallery, nhb, sco, sso
-from sources.common import Event, dedupe, is_probable_event, is_upcoming_event, sort_events
-
-SOURCES = [
-    esplanade,
-    sso,
-    sco,
-    artshouse,
-    gallery,
-    nhb,
-    cultural_centres,
-]
-
-
-def run() -> List[Event]:
-    events: List[Event] = []
-    for module in SOURCES:
-        try:
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import event_schema
+import event_store
+from sources import crawl_state, http, listing_cache, parse_cache, registry
+from sources.common import (
+    EXTRACTOR_VERSION,
+    SG_TZ,
+    Event,
+    dedupe,
+    iter_probable_events,
+    iter_source_events,
+    iter_upcoming_events,
+    sort_events,
+)
+from sources.listing_cache import ListingCache
+from sources.snapshot import SourceSnapshot
+
+# Days a source's last crawl stays valid; venues in cultural_centres carry
+# their own VenueConfig.refresh_days.
+REFRESH_DAYS = {
+    "esplanade": 7,
+    "sso": 7,
+    "sco": 7,
+    "artshouse": 7,
+    "gallery": 28,
+    "nhb": 28,
+}
+DEFAULT_REFRESH_DAYS = 7
+
+# data/events.jsonl by default; .jsonl.gz with --gzip, pretty .json with --pretty.
+EVENTS_STEM = Path("data/events")
+SNAPSHOT_PATH = Path("data/sources.json")
+LISTINGS_PATH = Path("data/listings.json")
+PARSE_CACHE_PATH = Path("data/parse_cache.json")
+CRAWL_STATE_PATH = Path("data/crawl_state.sqlite3")
+SHARDS_DIR = Path("data/shards")
+SOURCE_BUDGET_SECONDS = 600.0
+RUN_BUDGET_SECONDS = 2400.0
+
+
+def module_name(module) -> str:
+    return module.__name__.rsplit(".", 1)[-1]
+
+
+def source_refresh_days(module, source: str) -> float:
+    for cfg in getattr(module, "CONFIGS", None) or []:
+        if cfg.source == source:
+            return cfg.refresh_days
+    return REFRESH_DAYS.get(module_name(module), DEFAULT_REFRESH_DAYS)
+
+
+def load_previous_events(stem: Path) -> Dict[str, List[Event]]:
+    path = event_store.find_snapshot(stem)
+    if path is None:
+        return {}
+    by_source: Dict[str, List[Event]] = {}
+    try:
+        for row in event_store.iter_events(path):
             try:
-                events.extend(module.fetch(max_events=80))
-            except TypeError:
-                events.extend(module.fetch())
-        except Exception as exc:  # pragma: no cover
-            print(f"[warn] {module.__name__} failed: {exc}")
-    events = [e for e in events if is_probable_event(e)]
-    events = [e for e in events if is_upcoming_event(e)]
-    events = dedupe(events)
-    events = sort_events(events)
-    return events
+                event = Event.from_dict(row)
+            except (TypeError, ValueError):
+                continue
+            by_source.setdefault(event.source, []).append(event)
+    except (OSError, EOFError, ValueError):
+        return {}
+    return by_source
+
+
+def iter_raw_events(
+    max_events: int = 80,
+    previous: Optional[Dict[str, List[Event]]] = None,
+    snapshot: Optional[SourceSnapshot] = None,
+    refresh: bool = False,
+    source_budget: Optional[float] = SOURCE_BUDGET_SECONDS,
+    run_budget: Optional[float] = RUN_BUDGET_SECONDS,
+    selection: Optional[Dict[str, List[str]]] = None,
+    keep_others: bool = False,
+) -> Iterator[Event]:
+    """Crawl ``selection`` (every registered source by default).
+
+    With ``keep_others``, previous events of every source outside the
+    selection are passed through so the result merges into the existing
+    events file.
+    """
+    previous = previous or {}
+    if selection is None:
+        selection = registry.select()
+    ran = set()
+    with http.deadline(run_budget):
+        for name, sources in selection.items():
+            module = registry.load(name)
+            ran.update(sources)
+            stale = sources
+            if snapshot is not None and not refresh:
+                stale = [s for s in sources if not snapshot.is_fresh(s, source_refresh_days(module, s))]
+                fresh = [s for s in sources if s not in stale]
+                if fresh:
+                    print(f"[info] {name}: carrying forward {', '.join(fresh)} from the source snapshot")
+                for source in fresh:
+                    yield from snapshot.events(source)
+                if not stale:
+                    continue
+            options = {"venues": stale} if stale != registry.venues(name) else {}
+            crawled: Dict[str, List[Event]] = {source: [] for source in stale}
+            started = time.monotonic()
+            try:
+                with http.deadline(source_budget):
+                    for event in iter_source_events(module, max_events=max_events, **options):
+                        crawled.setdefault(event.source, []).append(event)
+                        yield event
+            except http.DeadlineExceeded:
+                print(f"[warn] {name} ran out of time after {time.monotonic() - started:.0f}s")
+            except Exception as exc:  # pragma: no cover
+                print(f"[warn] {name} failed: {exc}")
+            else:
+                # get() returns None on connection errors and bad statuses, so a
+                # dead listing shows up as a crawl that found nothing. A source
+                # that had events is not recorded as fresh with none.
+                failed = [source for source in stale if not crawled.get(source) and previous.get(source)]
+                if snapshot is not None:
+                    for source, events in crawled.items():
+                        if source not in failed:
+                            snapshot.record(source, events)
+                if not failed:
+                    continue
+                print(f"[warn] {name} found no events for {', '.join(failed)}")
+                stale = failed
+            # Events already yielded are kept; the last good snapshot fills the gaps
+            # and dedupe folds the overlap.
+            fallback = [ev for source in stale for ev in previous.get(source, [])]
+            if fallback:
+                print(f"[info] reusing {len(fallback)} {name} events from the previous snapshot")
+            yield from fallback
+    if keep_others:
+        for source, events in previous.items():
+            if source not in ran:
+                yield from events
+
+
+def tap_raw(
+    events: Iterable[Event],
+    counts: Optional[Counter],
+    on_raw: Optional[Callable[[Event], None]],
+) -> Iterator[Event]:
+    for event in events:
+        if counts is not None:
+            counts[event.source] += 1
+        if on_raw is not None:
+            on_raw(event)
+        yield event
+
+
+def finalize_events(events: Iterable[Event]) -> List[Event]:
+    # Dedupe in canonical source order (registry, then venue order), keeping
+    # each source's own order, so merged shards give the same result as one
+    # process.
+    order = registry.source_order()
+    ordered = sorted(events, key=lambda ev: order.get(ev.source, len(order)))
+    return sort_events(dedupe(ordered))
+
 
+def run(
+    previous: Optional[Dict[str, List[Event]]] = None,
+    snapshot: Optional[SourceSnapshot] = None,
+    refresh: bool = False,
+    source_budget: Optional[float] = SOURCE_BUDGET_SECONDS,
+    run_budget: Optional[float] = RUN_BUDGET_SECONDS,
+    raw_counts: Optional[Counter] = None,
+    selection: Optional[Dict[str, List[str]]] = None,
+    keep_others: bool = False,
+    on_raw: Optional[Callable[[Event], None]] = None,
+) -> List[Event]:
+    # Each stage pulls events one at a time, so a page is filtered (and its
+    # HTML released) before the next one is fetched.
+    events = iter_raw_events(
+        max_events=80,
+        previous=previous,
+        snapshot=snapshot,
+        refresh=refresh,
+        source_budget=source_budget,
+        run_budget=run_budget,
+        selection=selection,
+        keep_others=keep_others,
+    )
+    if raw_counts is not None or on_raw is not None:
+        events = tap_raw(events, raw_counts, on_raw)
+    events = iter_probable_events(events)
+    events = iter_upcoming_events(events)
+    return finalize_events(events)
 
-def save_events(events: List[Event], out_path: Path):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump([e.to_dict() for e in events], f, indent=2)
+
+def run_metadata(**extra) -> dict:
+    return {
+        "generated_at": datetime.now(tz=SG_TZ).isoformat(),
+        "extractor_version": EXTRACTOR_VERSION,
+        **extra,
+    }
+
+
+def save_events(events: List[Event], stem: Path = EVENTS_STEM, fmt: str = "jsonl") -> Path:
+    path = event_store.snapshot_path(stem, fmt)
+    # Rows are stored normalized, and tagged so build_site.py can skip doing it.
+    meta = run_metadata(
+        sources=sorted({e.source for e in events}),
+        normalization=event_schema.NORMALIZATION_VERSION,
+    )
+    event_store.write_events(path, (event_schema.normalize_row(e.to_dict()) for e in events), meta=meta)
+    # Leave exactly one snapshot behind so readers never pick up a stale format.
+    for other in event_store.SUFFIXES:
+        if other != fmt:
+            event_store.snapshot_path(stem, other).unlink(missing_ok=True)
+    return path
+
+
+def shard_path(index: int, count: int) -> Path:
+    return SHARDS_DIR / f"shard-{index}-of-{count}.jsonl.gz"
+
+
+def open_partial(path: Path, index: int, count: int, selection: Dict[str, List[str]]) -> event_store.EventWriter:
+    """Writer for a shard's raw (unfiltered, undeduped) events, appended in crawl order."""
+    return event_store.EventWriter(
+        path,
+        meta=run_metadata(
+            kind="shard",
+            shard=[index, count],
+            sources=[source for sources in selection.values() for source in sources],
+        ),
+    )
+
+
+def merge_partials(paths: Iterable[Path]) -> List[Event]:
+    """Combine shard snapshots exactly as a single run would have."""
+    paths = list(paths)
+    headers = [event_store.read_header(path) for path in paths]
+    for path, header in zip(paths, headers):
+        if header.get("kind") != "shard":
+            raise ValueError(f"{path} is not a shard snapshot")
+    counts = {header["shard"][1] for header in headers}
+    if len(counts) > 1:
+        raise ValueError(f"shard snapshots come from different shard counts: {sorted(counts)}")
+    if counts:
+        count = counts.pop()
+        missing = sorted(set(range(count)) - {header["shard"][0] for header in headers})
+        if missing:
+            print(f"[warn] missing shard snapshots for shards {missing} of {count}")
+    events = (Event.from_dict(row) for path in paths for row in event_store.iter_events(path))
+    return finalize_events(iter_upcoming_events(iter_probable_events(events)))
+
+
+def record_yields(
+    state: crawl_state.CrawlState,
+    raw_counts: Counter,
+    events: List[Event],
+    selection: Dict[str, List[str]],
+):
+    state.record_pattern_yields(events)
+    pages = state.detail_pages()
+    kept = Counter(event.source for event in events)
+    print("Yield per source (detail pages fetched / events extracted / events kept):")
+    for source in sorted(source for sources in selection.values() for source in sources):
+        state.record_source_yield(source, pages[source], raw_counts[source], kept[source])
+        print(f"  {source:<16} {pages[source]:>4} {raw_counts[source]:>5} {kept[source]:>5}")
+
+
+def split_names(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    index, _, count = value.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if shard[1] < 1 or not 0 <= shard[0] < shard[1]:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1, got {value!r}")
+    return shard
+
+
+def add_format_arguments(parser: argparse.ArgumentParser):
+    formats = parser.add_mutually_exclusive_group()
+    formats.add_argument("--gzip", dest="format", action="store_const", const="jsonl.gz", help="write gzip-compressed JSONL")
+    formats.add_argument("--pretty", dest="format", action="store_const", const="json", help="write an indented JSON array for reading")
+    parser.set_defaults(format="jsonl")
 
 
 def main():
-    events = run()
-    save_events(events, Path("data/events.json"))
-    print(f"Saved {len(events)} events to data/events.json")
+    parser = argparse.ArgumentParser(description="Scrape event sources into data/events.jsonl")
+    parser.add_argument("--source-budget", type=float, default=SOURCE_BUDGET_SECONDS, help="wall-clock seconds per source")
+    parser.add_argument("--run-budget", type=float, default=RUN_BUDGET_SECONDS, help="wall-clock seconds for the whole run")
+    parser.add_argument("--refresh", action="store_true", help="recrawl every source, ignoring refresh intervals")
+    parser.add_argument("--timeout", type=float, default=http.TIMEOUT, help="per-request timeout in seconds")
+    parser.add_argument("--only", type=split_names, default=[], help="comma-separated sources or venues to run, e.g. esplanade,acm")
+    parser.add_argument("--exclude", type=split_names, default=[], help="comma-separated sources or venues to skip")
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="crawl shard i of N (e.g. 0/4) into data/shards/shard-i-of-N.jsonl.gz; combine with merge_shards.py",
+    )
+    add_format_arguments(parser)
+    args = parser.parse_args()
+    try:
+        selection = registry.select(only=args.only, exclude=args.exclude)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.shard:
+        selection = registry.shard(selection, *args.shard)
+    partial = bool(args.only or args.exclude) and not args.shard
+
+    http.TIMEOUT = args.timeout
+    previous = load_previous_events(EVENTS_STEM)
+    snapshot = SourceSnapshot.load(SNAPSHOT_PATH)
+    listings = ListingCache.load(LISTINGS_PATH, replay=not args.refresh)
+    listing_cache.activate(listings)
+    parsed = parse_cache.ParseCache.load(PARSE_CACHE_PATH, extractor_version=EXTRACTOR_VERSION)
+    parse_cache.activate(parsed)
+    state = crawl_state.CrawlState(CRAWL_STATE_PATH)
+    crawl_state.activate(state)
+    raw_counts: Counter = Counter()
+    partial_writer = open_partial(shard_path(*args.shard), *args.shard, selection) if args.shard else None
+    try:
+        events = run(
+            previous=previous,
+            snapshot=snapshot,
+            refresh=args.refresh,
+            source_budget=args.source_budget,
+            run_budget=args.run_budget,
+            raw_counts=raw_counts,
+            selection=selection,
+            keep_others=partial,
+            on_raw=(lambda event: partial_writer.append([event.to_dict()])) if partial_writer else None,
+        )
+    except BaseException:
+        if partial_writer:
+            partial_writer.discard()
+        raise
+    record_yields(state, raw_counts, events, selection)
+    crawl_state.activate(None)
+    state.close()
+    if partial_writer:
+        partial_writer.close()
+        print(f"Saved {partial_writer.count} raw events for shard {args.shard[0]}/{args.shard[1]} to {partial_writer.path}")
+    else:
+        path = save_events(events, fmt=args.format)
+    snapshot.save()
+    listings.save()
+    parsed.save()
+    print(f"Parse cache: {parsed.hits} hits, {parsed.misses} misses")
+    if not partial_writer:
+        print(f"Saved {len(events)} events to {path}")
 
 
 if __name__ == "__main__":
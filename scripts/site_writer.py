@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 1
+# Below this many pending pages a process pool costs more than it saves.
+PARALLEL_MIN_PAGES = 200
+# Pages per task sent to a render worker.
+MAX_CHUNK = 256
+
+
+def input_hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_hash(paths: Iterable[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _render_chunk(render: Callable[[T], str], items: Sequence[T]) -> List[str]:
+    return [render(item) for item in items]
+
+
+def _write_file(path: Path, text: str):
+    path.write_text(text, encoding="utf-8")
+
+
+class SiteWriter:
+    """Writes site outputs whose inputs changed since the last build.
+
+    ``site/.build-manifest.json`` maps each output path to the hash of what
+    it was rendered from, plus a ``renderer`` hash of the rendering code; a
+    new renderer hash (or ``full``) re-renders everything.
+    """
+
+    def __init__(self, output_dir: Path, renderer: str, full: bool = False):
+        self.output_dir = output_dir
+        self.renderer = renderer
+        self.previous: Dict[str, str] = {} if full else self._load()
+        self.outputs: Dict[str, str] = {}
+        self.rendered = 0
+        self.skipped = 0
+        self.deleted = 0
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with (self.output_dir / MANIFEST_NAME).open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != MANIFEST_VERSION
+            or data.get("renderer") != self.renderer
+        ):
+            return {}
+        return data.get("outputs") or {}
+
+    def stale(self, rel: str, key: str) -> bool:
+        return self.previous.get(rel) != key or not (self.output_dir / rel).exists()
+
+    def write(self, rel: str, key: str, render: Callable[[], str]):
+        """Render and write ``rel`` unless it exists and ``key`` is unchanged."""
+        self.outputs[rel] = key
+        path = self.output_dir / rel
+        if not self.stale(rel, key):
+            self.skipped += 1
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(render(), encoding="utf-8")
+        self.rendered += 1
+
+    def write_all(self, pages: Sequence[Tuple[str, str, T]], render: Callable[[T], str], jobs: int = 1):
+        """Like ``write`` for many ``(rel, key, item)`` pages rendered by ``render(item)``.
+
+        With ``jobs`` > 1, pending pages are rendered in chunks across a
+        process pool (``render`` must be a module-level function) and written
+        by a thread pool as chunks come back. Output is the same as serial.
+        """
+        pending: List[Tuple[Path, T]] = []
+        for rel, key, item in pages:
+            self.outputs[rel] = key
+            if not self.stale(rel, key):
+                self.skipped += 1
+                continue
+            pending.append((self.output_dir / rel, item))
+        for parent in {path.parent for path, _ in pending}:
+            parent.mkdir(parents=True, exist_ok=True)
+
+        if jobs <= 1 or len(pending) < PARALLEL_MIN_PAGES:
+            for path, item in pending:
+                _write_file(path, render(item))
+        else:
+            size = max(1, min(MAX_CHUNK, -(-len(pending) // (jobs * 4))))
+            chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+            with ProcessPoolExecutor(max_workers=jobs) as renderers, ThreadPoolExecutor(max_workers=jobs) as writers:
+                texts = renderers.map(_render_chunk, [render] * len(chunks), [[item for _, item in chunk] for chunk in chunks])
+                writes = [
+                    writers.submit(_write_file, path, text)
+                    for chunk, rendered in zip(chunks, texts)
+                    for (path, _), text in zip(chunk, rendered)
+                ]
+                for future in writes:
+                    future.result()
+        self.rendered += len(pending)
+
+    def prune(self, *patterns: str):
+        """Delete outputs of the last build, and files matching ``patterns``, not written by this one."""
+        stale = set(self.previous)
+        for pattern in patterns:
+            stale.update(path.relative_to(self.output_dir).as_posix() for path in self.output_dir.glob(pattern))
+        for rel in sorted(stale - set(self.outputs)):
+            path = self.output_dir / rel
+            if path.is_file():
+                path.unlink()
+                self.deleted += 1
+
+    def save(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / MANIFEST_NAME
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "renderer": self.renderer, "outputs": self.outputs}, f)
+        tmp.replace(path)
+
+    def summary(self) -> str:
+        return f"{self.rendered} rendered, {self.skipped} skipped, {self.deleted} deleted"
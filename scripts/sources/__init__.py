@@ -1,10 +1,10 @@
-from . import artshouse, esplanade, gallery, nhb, sco, sso
+from . import registry
 
-__all__ = [
-    "artshouse",
-    "esplanade",
-    "gallery",
-    "nhb",
-    "sco",
-    "sso",
-]
+__all__ = registry.names()
+
+
+def __getattr__(name: str):
+    # Source modules are imported on first access, not when the package loads.
+    if name in __all__:
+        return registry.load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
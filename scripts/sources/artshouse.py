@@ -1,70 +1,25 @@
 from __future__ import annotations
 
-from bs4 import BeautifulSoup
+from typing import Iterator
 
-from .common import (
-    Event,
-    extract_jsonld_events,
-    infer_categories,
-    normalize_space,
-    parse_age_ranges,
-    parse_date,
-    summarize_age_ranges,
-)
-from .http import get
+from .common import Event
+from .spec import SourceSpec, iter_spec_events
 
 BASE = "https://www.artshouse.sg"
 LISTING = f"{BASE}/whats-on"
 
+SPEC = SourceSpec(
+    source="artshouse",
+    base=BASE,
+    listing=LISTING,
+    link_terms=("whats-on", "festivals", "children", "families"),
+    fallback_title="(Arts House event)",
+)
+
 
-def fetch(max_events: int = 20) -> list[Event]:
-    html = get(LISTING)
-    if not html:
-        return []
-    soup = BeautifulSoup(html, "lxml")
-    links: list[str] = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if href.startswith("/"):
-            href = BASE + href
-        if href.startswith(BASE) and any(seg in href for seg in ["whats-on", "festivals", "children", "families"]):
-            if href not in links:
-                links.append(href)
-        if len(links) >= max_events:
-            break
+def iter_events(max_events: int = SPEC.max_events) -> Iterator[Event]:
+    return iter_spec_events(SPEC, max_events=max_events)
 
-    events: list[Event] = []
-    events.extend(extract_jsonld_events(html, "artshouse", page_url=LISTING))
 
-    for url in links:
-        page = get(url)
-        if not page:
-            continue
-        jsonld = extract_jsonld_events(page, "artshouse", page_url=url)
-        if jsonld:
-            events.extend(jsonld)
-            continue
-        soup_ev = BeautifulSoup(page, "lxml")
-        title_el = soup_ev.find("h1")
-        date_el = soup_ev.find(string=lambda s: s and any(ch.isdigit() for ch in s))
-        start = parse_date(date_el) if date_el else None
-        age_ranges = parse_age_ranges(page)
-        age_min, age_max = summarize_age_ranges(age_ranges)
-        title = normalize_space(title_el.get_text()) if title_el else "(Arts House event)"
-        events.append(Event(
-            title=title,
-            url=url,
-            source="artshouse",
-            start=start,
-            age_min=age_min,
-            age_max=age_max,
-            age_ranges=age_ranges or None,
-            categories=infer_categories(
-                title=title,
-                url=url,
-                source="artshouse",
-                text_blob=normalize_space(date_el) if date_el else "",
-            ) or None,
-            raw_date=normalize_space(date_el) if date_el else None,
-        ))
-    return events
+def fetch(max_events: int = SPEC.max_events) -> list[Event]:
+    return list(iter_events(max_events=max_events))
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import random
+import re
+import zlib
+from datetime import date, timedelta
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+Span = Tuple[Optional[date], Optional[date]]
+
+# MinHash/LSH layout: NUM_PERM hashes split into BANDS bands of ROWS rows.
+# Titles with token Jaccard >= 0.7 share a band with ~96% probability.
+NUM_PERM = 24
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+TITLE_THRESHOLD = 0.7
+# Bucket members kept per (band, month); union-find makes later members
+# reachable through earlier ones.
+BUCKET_CAP = 16
+# Months of a run indexed for matching; longer runs only by their first months.
+MAX_WINDOWS = 6
+DATE_TOLERANCE = timedelta(days=1)
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({"a", "an", "and", "at", "by", "for", "in", "of", "on", "the", "to", "with"})
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def title_tokens(title: str) -> frozenset:
+    return frozenset(tok for tok in TOKEN_RE.findall(title.lower()) if tok not in STOPWORDS)
+
+
+def _minhash(tokens: frozenset) -> Tuple[int, ...]:
+    # crc32 rather than hash() so buckets are the same in every process.
+    hashed = [zlib.crc32(tok.encode("utf-8")) for tok in tokens]
+    return tuple(min((a * h + b) % _PRIME for h in hashed) for a, b in _PERMS)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [signature[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+
+
+def _windows(span: Span) -> List[Optional[int]]:
+    start, end = span
+    if start is None:
+        return [None]
+    first = start.year * 12 + start.month
+    last = first if end is None or end < start else end.year * 12 + end.month
+    return list(range(first, min(last, first + MAX_WINDOWS - 1) + 1))
+
+
+def _overlaps(a: Span, b: Span) -> bool:
+    if a[0] is None or b[0] is None:
+        return a[0] is None and b[0] is None
+    a_end = a[1] or a[0]
+    b_end = b[1] or b[0]
+    return a[0] <= b_end + DATE_TOLERANCE and b[0] <= a_end + DATE_TOLERANCE
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def cluster(
+    items: Sequence[T],
+    keys: Callable[[T], Iterable[Hashable]],
+    title: Optional[Callable[[T], str]] = None,
+    span: Optional[Callable[[T], Span]] = None,
+    threshold: float = TITLE_THRESHOLD,
+) -> List[List[T]]:
+    """Group items sharing any exact key, or with near-identical titles in overlapping dates.
+
+    ``keys`` yields exact keys per item (tag them, e.g. ``("url", ...)``, so
+    different kinds never collide). With ``title`` and ``span`` given, titles
+    are MinHashed and LSH buckets per month propose candidates, confirmed by
+    token Jaccard >= ``threshold`` and overlapping date spans. Clusters and
+    their members keep input order.
+    """
+    uf = UnionFind(len(items))
+    first_by_key: Dict[Hashable, int] = {}
+    for i, item in enumerate(items):
+        for key in keys(item):
+            j = first_by_key.setdefault(key, i)
+            if j != i:
+                uf.union(j, i)
+
+    if title is not None and span is not None:
+        buckets: Dict[Tuple[int, Tuple[int, ...], Optional[int]], List[int]] = {}
+        signatures: Dict[frozenset, Tuple[int, ...]] = {}
+        tokens_of: List[frozenset] = []
+        spans: List[Span] = []
+        for i, item in enumerate(items):
+            tokens = title_tokens(title(item))
+            tokens_of.append(tokens)
+            spans.append(span(item))
+            # One-word titles are too generic to match on without an exact key.
+            if len(tokens) < 2:
+                continue
+            signature = signatures.get(tokens)
+            if signature is None:
+                signature = signatures[tokens] = _minhash(tokens)
+            windows = _windows(spans[i])
+            bucket_keys = [
+                (band_index, band, window)
+                for band_index, band in enumerate(_bands(signature))
+                for window in windows
+            ]
+            checked = set()
+            for bucket_key in bucket_keys:
+                for j in buckets.get(bucket_key, ()):
+                    if j in checked:
+                        continue
+                    checked.add(j)
+                    if (
+                        _overlaps(spans[i], spans[j])
+                        and _jaccard(tokens, tokens_of[j]) >= threshold
+                    ):
+                        uf.union(j, i)
+            for bucket_key in bucket_keys:
+                members = buckets.setdefault(bucket_key, [])
+                if len(members) < BUCKET_CAP:
+                    members.append(i)
+
+    groups: Dict[int, List[T]] = {}
+    for i, item in enumerate(items):
+        groups.setdefault(uf.find(i), []).append(item)
+    return list(groups.values())
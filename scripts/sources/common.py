@@ -1,16 +1,25 @@
+import functools
+import inspect
 import json
 import re
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from dataclasses import dataclass, asdict, fields
+from datetime import date, datetime
 from urllib.parse import urlparse
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 import dateutil.parser
 import pytz
 from bs4 import BeautifulSoup
 
+from . import parse_cache
+from .clustering import cluster
+
 SG_TZ = pytz.timezone("Asia/Singapore")
 
+# Bump whenever extraction or normalization logic changes; cached parse
+# results from other versions are discarded.
+EXTRACTOR_VERSION = 4
+
 BLOCKED_TITLE_TERMS = {
     "exhibitions",
     "programmes",
@@ -76,6 +85,19 @@ CATEGORY_PATTERNS = {
     "Exhibition": re.compile(r"\b(exhibition|exhibit|gallery|museum|installation|visual[\s-]?arts)\b", re.IGNORECASE),
 }
 
+PRICE_FIELDS = ("price_min", "price_max", "currency", "is_free")
+# Currency markers in listing prices; a bare "$" on these sites means SGD.
+CURRENCY_MARKERS = {"s$": "SGD", "sgd": "SGD", "us$": "USD", "usd": "USD", "$": "SGD"}
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?)"
+_MARKER = r"(?<![a-z])(s\$|us\$|\$|sgd|usd)"
+PRICE_MARKED_RE = re.compile(
+    _MARKER + r"\s*" + _AMOUNT + r"(?:\s*(?:-|–|—|to)\s*(?:s\$|\$|sgd)?\s*" + _AMOUNT + r")?",
+    re.IGNORECASE,
+)
+# "30 SGD", "12.50 USD"
+PRICE_SUFFIXED_RE = re.compile(_AMOUNT + r"\s*(sgd|usd)\b", re.IGNORECASE)
+PRICE_FREE_RE = re.compile(r"\b(free|complimentary|no charge)\b", re.IGNORECASE)
+
 SOURCE_DEFAULT_CATEGORIES = {
     "sso": ["Orchestra", "Music"],
     "sco": ["Orchestra", "Music"],
@@ -112,6 +134,10 @@ class Event:
     categories: Optional[List[str]] = None
     image: Optional[str] = None
     raw_date: Optional[str] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    currency: Optional[str] = None
+    is_free: Optional[bool] = None
 
     def to_dict(self):
         data = asdict(self)
@@ -123,6 +149,20 @@ class Event:
             data["raw_date"] = clean_text(self.raw_date)
         return data
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Event":
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        for key in ("start", "end"):
+            value = values.get(key)
+            values[key] = datetime.fromisoformat(value) if isinstance(value, str) and value else None
+        if values.get("age_ranges"):
+            values["age_ranges"] = [tuple(rng) for rng in values["age_ranges"]]
+        if values.get("price") and "is_free" not in data:
+            # Rows written before prices were parsed.
+            values.update(zip(PRICE_FIELDS, parse_price(values["price"])))
+        return cls(**values)
+
 def normalize_space(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
@@ -133,9 +173,15 @@ def clean_text(text: str) -> str:
     return normalize_space(plain)
 
 
+def _anchor_year() -> int:
+    """The year ``parse_date`` fills in for partial dates and checks dates against."""
+    return datetime.now(tz=SG_TZ).year
+
+
 def parse_date(text: str) -> Optional[datetime]:
     if not text:
         return None
+    year = _anchor_year()
     try:
         normalized = clean_text(text)
         normalized = re.sub(r"\s*/\s*", " ", normalized)
@@ -145,19 +191,73 @@ def parse_date(text: str) -> Optional[datetime]:
             normalized,
             flags=re.IGNORECASE,
         )
-        dt = dateutil.parser.parse(normalized, dayfirst=False, fuzzy=True)
+        # Missing fields come from 1 Jan of the anchor year rather than
+        # today, so the result depends on the clock only through the year.
+        dt = dateutil.parser.parse(normalized, dayfirst=False, fuzzy=True, default=datetime(year, 1, 1))
         if dt.tzinfo is None:
             dt = SG_TZ.localize(dt)
         else:
             dt = dt.astimezone(SG_TZ)
-        now = datetime.now(tz=SG_TZ)
-        if dt.year < now.year - 1 or dt.year > now.year + 3:
+        if dt.year < year - 1 or dt.year > year + 3:
             return None
         return dt
     except (ValueError, OverflowError):
         return None
 
 
+def _amount(text: str) -> Optional[float]:
+    try:
+        value = float(text.replace(",", ""))
+    except ValueError:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def parse_price(text: Optional[str]) -> tuple[Optional[float], Optional[float], Optional[str], Optional[bool]]:
+    """Lowest and highest amount, currency and whether entry is free, from a price text.
+
+    Handles ranges ("$25 - $65", "S$25-65"), concession tiers (the lowest
+    tier is the minimum) and free entry. Only amounts with a currency
+    marker count, so ages, dates and head counts are ignored. A partly free
+    event has a minimum of 0 but is not ``is_free``.
+
+    >>> parse_price("$25, ages 3 and up")
+    (25, 25, 'SGD', False)
+    >>> parse_price("$20, free for under 3s")
+    (0, 20, 'SGD', False)
+    >>> parse_price("Free with registration. Limited to 30 participants")
+    (0, 0, None, True)
+    >>> parse_price("Free (register by 10 Jan)")
+    (0, 0, None, True)
+    >>> parse_price("Free admission. Ages 3-12")
+    (0, 0, None, True)
+    >>> parse_price("Adults 30 SGD, children 3 and under free")
+    (0, 30, 'SGD', False)
+    >>> parse_price("Limited to 30 participants")
+    (None, None, None, None)
+    """
+    if not text:
+        return None, None, None, None
+    blob = normalize_space(str(text))
+    amounts: List[float] = []
+    currencies: List[str] = []
+    for match in PRICE_MARKED_RE.finditer(blob):
+        currencies.append(CURRENCY_MARKERS[match.group(1).lower()])
+        amounts.extend(a for a in (_amount(g) for g in match.group(2, 3) if g) if a is not None)
+    for match in PRICE_SUFFIXED_RE.finditer(PRICE_MARKED_RE.sub(" ", blob)):
+        currencies.append(CURRENCY_MARKERS[match.group(2).lower()])
+        amount = _amount(match.group(1))
+        if amount is not None:
+            amounts.append(amount)
+    free = bool(PRICE_FREE_RE.search(blob))
+    if not amounts and not free:
+        return None, None, None, None
+    if free:
+        amounts.append(0)
+    is_free = max(amounts) == 0
+    return min(amounts), max(amounts), (currencies[0] if currencies else None), is_free
+
+
 def _normalize_age_range(lo: Optional[int], hi: Optional[int]) -> tuple[Optional[int], Optional[int]]:
     if lo is not None and lo > 17:
         return None, None
@@ -392,6 +492,79 @@ def is_upcoming_event(event: Event, reference: Optional[datetime] = None) -> boo
     return True
 
 
+def iter_probable_events(events: Iterable[Event]) -> Iterator[Event]:
+    for event in events:
+        if is_probable_event(event):
+            yield event
+
+
+def iter_upcoming_events(events: Iterable[Event], reference: Optional[datetime] = None) -> Iterator[Event]:
+    ref = reference or datetime.now(tz=SG_TZ)
+    for event in events:
+        if is_upcoming_event(event, reference=ref):
+            yield event
+
+
+def iter_source_events(module, max_events: int = 80, **options) -> Iterator[Event]:
+    """Stream events from a source module.
+
+    Modules exposing ``iter_events`` are consumed lazily; older modules that
+    only provide a list-returning ``fetch`` are adapted, and only get
+    ``max_events`` if they take it. Extra ``options`` are passed through to
+    the module.
+    """
+    iter_events = getattr(module, "iter_events", None)
+    if iter_events is not None:
+        yield from iter_events(max_events=max_events, **options)
+        return
+    params = inspect.signature(module.fetch).parameters
+    if "max_events" in params or any(p.kind is p.VAR_KEYWORD for p in params.values()):
+        options["max_events"] = max_events
+    yield from module.fetch(**options)
+
+
+def _encode_extraction(result):
+    if isinstance(result, list):
+        return {"events": [ev.to_dict() for ev in result]}
+    return {"event": result.to_dict() if result is not None else None}
+
+
+def _decode_extraction(payload):
+    if "events" in payload:
+        return [Event.from_dict(row) for row in payload["events"]]
+    return Event.from_dict(payload["event"]) if payload.get("event") else None
+
+
+def cached_extraction(func):
+    """Memoize an extractor ``func(html, ...)`` in the active parse cache.
+
+    Returns a list of events or a single optional event, rebuilt from the cache
+    without touching BeautifulSoup or dateutil when the page content is known.
+    Keys include the year ``parse_date`` anchors partial dates to, so a page
+    cached before New Year is parsed again after it.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(html, *args, **kwargs):
+        cache = parse_cache.active()
+        if cache is None or not html:
+            return func(html, *args, **kwargs)
+        key = parse_cache.cache_key(f"{name}@{_anchor_year()}", html, args, kwargs)
+        payload = cache.get(key)
+        if payload is not None:
+            try:
+                return _decode_extraction(payload)
+            except (KeyError, TypeError, ValueError):
+                pass
+        result = func(html, *args, **kwargs)
+        cache.put(key, _encode_extraction(result))
+        return result
+
+    return wrapper
+
+
+@cached_extraction
 def extract_jsonld_events(
     html: str,
     source: str,
@@ -419,7 +592,9 @@ def extract_jsonld_events(
             offers = item.get("offers") or {}
             price = None
             if isinstance(offers, dict):
-                price = offers.get("priceCurrency", "") + " " + str(offers.get("price")) if offers.get("price") else offers.get("description")
+                # Bare numbers don't count as prices; listings here are in SGD.
+                price = (offers.get("priceCurrency") or "SGD") + " " + str(offers.get("price")) if offers.get("price") is not None else offers.get("description")
+            price_min, price_max, currency, is_free = parse_price(price)
             image = item.get("image")
             venue = None
             loc = item.get("location")
@@ -444,6 +619,10 @@ def extract_jsonld_events(
                 end=end,
                 venue=venue,
                 price=price,
+                price_min=price_min,
+                price_max=price_max,
+                currency=currency,
+                is_free=is_free,
                 age_min=age_min,
                 age_max=age_max,
                 age_ranges=age_ranges or None,
@@ -453,7 +632,20 @@ def extract_jsonld_events(
     return events
 
 
-def dedupe(events: List[Event]) -> List[Event]:
+def event_span(ev: Event) -> tuple[Optional[date], Optional[date]]:
+    start = ev.start.astimezone(SG_TZ).date() if ev.start else None
+    end = ev.end.astimezone(SG_TZ).date() if ev.end else None
+    return start, end
+
+
+def dedupe_key(ev: Event) -> tuple[str, str]:
+    if ev.url:
+        return ("url", ev.url.rstrip("/").lower())
+    start_key = ev.start.isoformat() if ev.start else ""
+    return ("title_start", f"{ev.title.lower()}|{start_key}")
+
+
+def dedupe(events: Iterable[Event]) -> List[Event]:
     def merge_events(left: Event, right: Event) -> Event:
         merged = left
         if not merged.start or (right.start and right.start < merged.start):
@@ -464,6 +656,8 @@ def dedupe(events: List[Event]) -> List[Event]:
             merged.venue = right.venue
         if not merged.price:
             merged.price = right.price
+            merged.price_min, merged.price_max = right.price_min, right.price_max
+            merged.currency, merged.is_free = right.currency, right.is_free
         if merged.age_min is None:
             merged.age_min = right.age_min
         if merged.age_max is None:
@@ -491,20 +685,10 @@ def dedupe(events: List[Event]) -> List[Event]:
             merged.categories = combined
         return merged
 
-    by_key: dict[tuple[str, str], Event] = {}
-    for ev in events:
-        if ev.url:
-            key = ("url", ev.url.rstrip("/").lower())
-        else:
-            start_key = ev.start.isoformat() if ev.start else ""
-            key = ("title_start", f"{ev.title.lower()}|{start_key}")
-        if key in by_key:
-            by_key[key] = merge_events(by_key[key], ev)
-            continue
-        by_key[key] = ev
-    return list(by_key.values())
+    clusters = cluster(list(events), keys=lambda ev: [dedupe_key(ev)], title=lambda ev: ev.title, span=event_span)
+    return [functools.reduce(merge_events, members) for members in clusters]
 
 
-def sort_events(events: List[Event]) -> List[Event]:
+def sort_events(events: Iterable[Event]) -> List[Event]:
     fallback = datetime.now(tz=SG_TZ)
     return sorted(events, key=lambda e: e.start.astimezone(SG_TZ) if e.start else fallback)
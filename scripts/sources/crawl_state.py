@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .common import SG_TZ, Event, dedupe_key
+from .parse_cache import content_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    canonical_url TEXT,
+    source TEXT,
+    last_fetched TEXT,
+    status INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    fail_streak INTEGER NOT NULL DEFAULT 0,
+    empty_streak INTEGER NOT NULL DEFAULT 0,
+    events_json TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_source ON pages (source);
+CREATE TABLE IF NOT EXISTS source_yields (
+    run_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    events INTEGER NOT NULL,
+    kept INTEGER NOT NULL,
+    PRIMARY KEY (run_id, source)
+);
+CREATE TABLE IF NOT EXISTS pattern_yields (
+    run_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    kept INTEGER NOT NULL,
+    PRIMARY KEY (run_id, source, pattern)
+);
+"""
+
+SEGMENT_ID_RE = re.compile(r"\d")
+
+
+@dataclass(frozen=True)
+class PageState:
+    url: str
+    canonical_url: Optional[str]
+    source: Optional[str]
+    last_fetched: Optional[datetime]
+    status: Optional[int]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: Optional[str]
+    fail_streak: int
+    empty_streak: int
+    events_json: Optional[str]
+
+    def events(self) -> List[Event]:
+        if not self.events_json:
+            return []
+        return [Event.from_dict(row) for row in json.loads(self.events_json)]
+
+
+def _now() -> str:
+    return datetime.now(tz=SG_TZ).isoformat()
+
+
+def _canonical(url: str) -> str:
+    return url.split("#", 1)[0].rstrip("/").lower()
+
+
+def url_pattern(url: str) -> str:
+    """Group URLs by host and path shape: ``sso.org.sg/whats-on/*``.
+
+    The last path segment, and any segment containing a digit, is treated as an
+    identifier.
+    """
+    parts = urlsplit(url)
+    segments = [seg for seg in parts.path.lower().split("/") if seg]
+    shape = ["*" if SEGMENT_ID_RE.search(seg) else seg for seg in segments[:-1]]
+    if segments:
+        shape.append("*")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host + "/" + "/".join(shape)
+
+
+def pattern_score(pages: int, kept: int) -> float:
+    # Smoothed so untried patterns start in the middle rather than at zero.
+    return (kept + 1) / (pages + 2)
+
+
+class CrawlState:
+    """Per-URL crawl history shared across runs, safe to write from several threads."""
+
+    def __init__(self, path: Union[Path, str] = ":memory:"):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = _now()
+        self._lock = threading.Lock()
+        # This run's detail pages per (source, pattern), and which pattern first
+        # produced each event, keyed like dedupe.
+        self._pattern_pages: Counter[Tuple[str, str]] = Counter()
+        self._origins: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            if str(path) != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def page(self, url: str) -> Optional[PageState]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        data = dict(row)
+        data["last_fetched"] = datetime.fromisoformat(data["last_fetched"]) if data["last_fetched"] else None
+        return PageState(**data)
+
+    def record_fetch(
+        self,
+        url: str,
+        status: int,
+        body: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        failed = status == 0 or status >= 400
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO pages (url, canonical_url, last_fetched, status, etag, last_modified, content_hash, fail_streak)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    last_fetched = excluded.last_fetched,
+                    status = excluded.status,
+                    etag = COALESCE(excluded.etag, pages.etag),
+                    last_modified = COALESCE(excluded.last_modified, pages.last_modified),
+                    content_hash = COALESCE(excluded.content_hash, pages.content_hash),
+                    fail_streak = CASE WHEN ? THEN pages.fail_streak + 1 ELSE 0 END
+                """,
+                (
+                    url,
+                    _canonical(url),
+                    _now(),
+                    status,
+                    etag,
+                    last_modified,
+                    content_hash(body) if body else None,
+                    1 if failed else 0,
+                    failed,
+                ),
+            )
+
+    def record_events(self, url: str, source: str, events: Iterable[Event], productive: Optional[bool]):
+        """Store what a page produced; ``productive`` drives the empty streak.
+
+        ``productive`` is None for listing and hub pages, which leaves their
+        streak alone and keeps them out of this run's detail page counts.
+        """
+        events = list(events)
+        payload = json.dumps([ev.to_dict() for ev in events])
+        origin = (source, url_pattern(url))
+        with self._lock, self._conn:
+            if productive is not None:
+                self._pattern_pages[origin] += 1
+            for ev in events:
+                self._origins.setdefault(dedupe_key(ev), origin)
+            self._conn.execute(
+                """
+                INSERT INTO pages (url, canonical_url, source, events_json, empty_streak)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    source = excluded.source,
+                    events_json = excluded.events_json,
+                    empty_streak = CASE WHEN ? IS NULL THEN pages.empty_streak WHEN ? THEN 0 ELSE pages.empty_streak + 1 END
+                """,
+                (url, _canonical(url), source, payload, 1 if productive is False else 0, productive, productive),
+            )
+
+    def should_skip(
+        self,
+        url: str,
+        max_failures: int = 2,
+        max_empty: int = 3,
+        retry_after_days: float = 28,
+    ) -> bool:
+        """Skip URLs that keep failing or yielding nothing, retrying them now and then."""
+        state = self.page(url)
+        if state is None or state.last_fetched is None:
+            return False
+        if datetime.now(tz=SG_TZ) - state.last_fetched > timedelta(days=retry_after_days):
+            return False
+        return state.fail_streak >= max_failures or state.empty_streak >= max_empty
+
+    def record_source_yield(self, source: str, pages: int, events: int, kept: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO source_yields (run_id, source, pages, events, kept) VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, source, pages, events, kept),
+            )
+
+    def record_pattern_yields(self, kept: Iterable[Event]):
+        """Credit each kept event to the URL pattern of the page it came from."""
+        with self._lock:
+            kept_by_origin = Counter(
+                self._origins[key] for key in (dedupe_key(ev) for ev in kept) if key in self._origins
+            )
+            rows = [
+                (self.run_id, source, pattern, pages, kept_by_origin[(source, pattern)])
+                for (source, pattern), pages in self._pattern_pages.items()
+            ]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pattern_yields (run_id, source, pattern, pages, kept) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+    def pattern_scores(self, source: str, runs: int = 5) -> Dict[str, float]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT pattern, SUM(pages), SUM(kept) FROM pattern_yields
+                WHERE source = ? AND run_id IN (
+                    SELECT DISTINCT run_id FROM pattern_yields WHERE source = ? ORDER BY run_id DESC LIMIT ?
+                )
+                GROUP BY pattern
+                """,
+                (source, source, runs),
+            ).fetchall()
+        return {pattern: pattern_score(pages, kept) for pattern, pages, kept in rows}
+
+    def detail_pages(self) -> Counter[str]:
+        """Detail pages this run fetched and extracted, per source."""
+        with self._lock:
+            pages: Counter[str] = Counter()
+            for (source, _), count in self._pattern_pages.items():
+                pages[source] += count
+        return pages
+
+    def yield_history(self, source: str, runs: int = 5) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM source_yields WHERE source = ? ORDER BY run_id DESC LIMIT ?",
+                (source, runs),
+            ).fetchall()
+
+
+_active: Optional[CrawlState] = None
+
+
+def activate(state: Optional[CrawlState]):
+    global _active
+    _active = state
+
+
+def active() -> Optional[CrawlState]:
+    return _active
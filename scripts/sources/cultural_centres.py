@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+from typing import Collection, Iterator, List, Optional
 from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup
 
 from .common import (
     Event,
+    cached_extraction,
     extract_jsonld_events,
     infer_categories,
     normalize_space,
@@ -16,159 +17,12 @@ from .common import (
     parse_date_range,
     summarize_age_ranges,
 )
+from .frontier import PRIORITY_DETAIL, PRIORITY_LISTING, Frontier
 from .http import get
+from .sitemap import SitemapEntry, iter_sitemap, robots_sitemaps
+from .venue_configs import CONFIGS, VenueConfig
 
 
-@dataclass(frozen=True)
-class VenueConfig:
-    source: str
-    base: str
-    listings: tuple[str, ...]
-    allow_terms: tuple[str, ...]
-    blocked_terms: tuple[str, ...] = ()
-    max_links: int = 24
-
-
-CONFIGS = [
-    VenueConfig(
-        source="wildrice",
-        base="https://www.wildrice.com.sg",
-        listings=(
-            "https://www.wildrice.com.sg/whats-on/",
-        ),
-        allow_terms=("/whats-on/", "/event/", "/events/"),
-        blocked_terms=("/whats-on/page/", "/what-s-on", "/about", "/privacy", "/careers"),
-    ),
-    VenueConfig(
-        source="srt",
-        base="https://www.srt.com.sg",
-        listings=(
-            "https://www.srt.com.sg/",
-            "https://www.srt.com.sg/index",
-        ),
-        allow_terms=("/whats-on", "/event", "/events", "/show", "/production", "/stage-camp"),
-        blocked_terms=(
-            "/about",
-            "/privacy",
-            "/careers",
-            "/contact",
-            "/blog",
-            "/news",
-            "/support",
-            "/friends-of-srt",
-            "/people-at-srt",
-        ),
-    ),
-    VenueConfig(
-        source="practice",
-        base="https://www.practice.org.sg",
-        listings=(
-            "https://www.practice.org.sg/whats-on",
-        ),
-        allow_terms=("/whats-on", "/event", "/events", "/programme", "/programmes"),
-        blocked_terms=("/about", "/privacy", "/careers", "/contact"),
-    ),
-    VenueConfig(
-        source="sam",
-        base="https://www.singaporeartmuseum.sg",
-        listings=(
-            "https://www.singaporeartmuseum.sg/art-events",
-            "https://www.singaporeartmuseum.sg/Art-Events",
-        ),
-        allow_terms=("/art-events/", "/events/", "/event/", "/exhibition"),
-    ),
-    VenueConfig(
-        source="artscience",
-        base="https://www.marinabaysands.com",
-        listings=(
-            "https://www.marinabaysands.com/museum/exhibitions.html",
-        ),
-        allow_terms=("/museum/", "/events/", "/event/", "/exhibition", "/programmes"),
-    ),
-    VenueConfig(
-        source="sandstheatre",
-        base="https://www.marinabaysands.com",
-        listings=(
-            "https://www.marinabaysands.com/entertainment/shows.html",
-        ),
-        allow_terms=("/entertainment/", "/shows/", "/show/", "/events/", "/event/"),
-        blocked_terms=("/entertainment.html",),
-    ),
-    VenueConfig(
-        source="peranakan",
-        base="https://www.nhb.gov.sg/peranakanmuseum",
-        listings=(
-            "https://www.nhb.gov.sg/peranakanmuseum/whatson/exhibitions",
-            "https://www.nhb.gov.sg/peranakanmuseum/whatson/programmes",
-        ),
-        allow_terms=("/whatson/", "/events/", "/event/", "/exhibition", "/programme"),
-    ),
-    VenueConfig(
-        source="acm",
-        base="https://www.nhb.gov.sg/acm",
-        listings=(
-            "https://www.nhb.gov.sg/acm/whats-on/overview/",
-            "https://www.nhb.gov.sg/acm/whats-on/programmes",
-            "https://www.nhb.gov.sg/acm/whats-on/exhibitions",
-        ),
-        allow_terms=("/whats-on/", "/exhibitions/", "/programmes/", "/lectures-and-seminars/"),
-        blocked_terms=("/whats-on/overview", "/view-all"),
-    ),
-    VenueConfig(
-        source="ihc",
-        base="https://www.indianheritage.gov.sg",
-        listings=(
-            "https://www.indianheritage.gov.sg/en/whats-on/programmes",
-            "https://www.indianheritage.gov.sg/en/whats-on/exhibitions",
-        ),
-        allow_terms=("/whats-on/", "/events/", "/event/", "/programmes", "/exhibition"),
-    ),
-    VenueConfig(
-        source="childrensmuseum",
-        base="https://www.heritage.sg/childrensmuseum",
-        listings=(
-            "https://www.heritage.sg/childrensmuseum/whatson/activities",
-            "https://www.heritage.sg/childrensmuseum/whatson/exhibitions",
-        ),
-        allow_terms=("/whatson/", "/events/", "/event/", "/programmes", "/exhibition"),
-    ),
-    VenueConfig(
-        source="changi",
-        base="https://www.changichapelmuseum.gov.sg",
-        listings=(
-            "https://www.changichapelmuseum.gov.sg/",
-        ),
-        allow_terms=("/whats-on/", "/events/", "/event/", "/programme", "/exhibition"),
-    ),
-    VenueConfig(
-        source="bukitchandu",
-        base="https://www.heritage.sg/reflectionsatbukitchandu",
-        listings=(
-            "https://www.heritage.sg/reflectionsatbukitchandu/whats-on/exhibitions",
-            "https://www.heritage.sg/reflectionsatbukitchandu/whats-on/programmes",
-        ),
-        allow_terms=("/whats-on/", "/events/", "/event/", "/programmes", "/exhibition"),
-    ),
-    VenueConfig(
-        source="sccc",
-        base="https://singaporeccc.org.sg",
-        listings=(
-            "https://singaporeccc.org.sg/events/",
-            "https://singaporeccc.org.sg/whats-on/",
-        ),
-        allow_terms=("/events/", "/event/", "/whats-on/", "/programme", "/programmes"),
-    ),
-    VenueConfig(
-        source="gateway",
-        base="https://gatewaytheatre.sg",
-        listings=(
-            "https://gatewaytheatre.sg/whats-on/",
-            "https://gatewaytheatre.sg/gateway-kids-club/",
-        ),
-        allow_terms=("/events/", "/event/", "/whats-on/", "/gateway-kids-club"),
-    ),
-]
-
 BLOCKED_FALLBACK_TITLES = {
     "what's on",
     "whats on",
@@ -191,19 +45,23 @@ def _same_domain(url: str, base: str) -> bool:
     return bool(host) and (host == root or host.endswith("." + root))
 
 
+def _accept_link(href: str, cfg: VenueConfig) -> bool:
+    if not href.startswith("http"):
+        return False
+    if not _same_domain(href, cfg.base):
+        return False
+    href_lower = href.lower()
+    if not any(term in href_lower for term in cfg.allow_terms):
+        return False
+    return not any(term in href_lower for term in cfg.blocked_terms)
+
+
 def _collect_links(html: str, cfg: VenueConfig) -> list[str]:
     soup = BeautifulSoup(html, "lxml")
     links: list[str] = []
     for a in soup.find_all("a", href=True):
         href = urljoin(cfg.base, a["href"])
-        if not href.startswith("http"):
-            continue
-        if not _same_domain(href, cfg.base):
-            continue
-        href_lower = href.lower()
-        if not any(term in href_lower for term in cfg.allow_terms):
-            continue
-        if any(term in href_lower for term in cfg.blocked_terms):
+        if not _accept_link(href, cfg):
             continue
         if href not in links:
             links.append(href)
@@ -236,6 +94,7 @@ def _find_date_text(page: str, soup: BeautifulSoup) -> str | None:
     return None
 
 
+@cached_extraction
 def _fallback_event(page: str, url: str, source: str) -> Event | None:
     soup = BeautifulSoup(page, "lxml")
     title_el = soup.find("h1") or soup.find("h2")
@@ -275,41 +134,82 @@ def _fallback_event(page: str, url: str, source: str) -> Event | None:
     )
 
 
-def fetch(max_events: int = 200) -> list[Event]:
-    events: list[Event] = []
-    for cfg in CONFIGS:
-        for listing in cfg.listings:
-            html = get(listing)
-            if not html:
+def _sitemap_entries(cfg: VenueConfig) -> List[SitemapEntry]:
+    sitemaps = list(cfg.sitemaps) or robots_sitemaps(cfg.base) or [urljoin(cfg.base, "/sitemap.xml")]
+    entries: dict[str, SitemapEntry] = {}
+    for url in sitemaps:
+        for entry in iter_sitemap(url):
+            if entry.url not in entries and _accept_link(entry.url, cfg):
+                entries[entry.url] = entry
+    # Newest first, so the venue's page budget goes to recent changes.
+    return sorted(entries.values(), key=lambda e: e.lastmod.timestamp() if e.lastmod else 0, reverse=True)
+
+
+def _queue_sitemap_entries(entries: List[SitemapEntry], cfg: VenueConfig, frontier: Frontier) -> Iterator[Event]:
+    """Queue new or changed pages; pages unchanged since their last fetch replay stored events."""
+    state = frontier.state
+    for entry in entries:
+        known = state.page(entry.url) if state is not None and entry.lastmod else None
+        if (
+            known is not None
+            and known.last_fetched is not None
+            and known.events_json is not None
+            and entry.lastmod <= known.last_fetched
+        ):
+            yield from known.events()
+            continue
+        frontier.add(entry.url, kind=PRIORITY_DETAIL, venue=cfg.source)
+
+
+def venue_budgets(max_events: int) -> dict[str, int]:
+    """Pages each venue may fetch: its listings plus a share of ``max_events`` detail pages.
+
+    Detail pages are split evenly over all CONFIGS, and what a venue's
+    ``max_links`` cannot use is split among the others. Only CONFIGS feed
+    this, so a venue crawls the same pages whether it runs alone, in a
+    subset or on another shard.
+    """
+    shares: dict[str, int] = {}
+    remaining = max_events
+    by_cap = sorted(CONFIGS, key=lambda cfg: cfg.max_links)
+    for i, cfg in enumerate(by_cap):
+        shares[cfg.source] = min(cfg.max_links, remaining // (len(by_cap) - i))
+        remaining -= shares[cfg.source]
+    return {cfg.source: len(cfg.listings) + max(1, shares[cfg.source]) for cfg in CONFIGS}
+
+
+def iter_events(max_events: int = 200, venues: Optional[Collection[str]] = None) -> Iterator[Event]:
+    # Venues take turns, each capped at its own allowance, so the budget is
+    # spread across CONFIGS instead of going to the first few.
+    selected = [cfg for cfg in CONFIGS if venues is None or cfg.source in venues]
+    configs = {cfg.source: cfg for cfg in selected}
+    frontier = Frontier(venue_budgets=venue_budgets(max_events))
+    for cfg in selected:
+        if cfg.discovery == "sitemap":
+            entries = _sitemap_entries(cfg)
+            if entries:
+                yield from _queue_sitemap_entries(entries, cfg, frontier)
                 continue
-            events.extend(
-                extract_jsonld_events(
-                    html,
-                    cfg.source,
-                    page_url=listing,
-                    fallback_age_text=html,
-                )
-            )
-            for url in _collect_links(html, cfg):
-                page = get(url)
-                if not page:
-                    continue
-                jsonld = extract_jsonld_events(
-                    page,
-                    cfg.source,
-                    page_url=url,
-                    fallback_age_text=page,
-                )
-                if jsonld:
-                    events.extend(jsonld)
-                    continue
-                fallback = _fallback_event(page, url, cfg.source)
-                if fallback:
-                    events.append(fallback)
-                if len(events) >= max_events:
-                    break
-            if len(events) >= max_events:
-                break
-        if len(events) >= max_events:
-            break
-    return events
+        frontier.extend(cfg.listings, kind=PRIORITY_LISTING, venue=cfg.source)
+
+    for item in frontier:
+        cfg = configs[item.venue]
+        page = get(item.url)
+        if not page:
+            continue
+        jsonld = extract_jsonld_events(
+            page,
+            cfg.source,
+            page_url=item.url,
+            fallback_age_text=page,
+        )
+        if item.kind == PRIORITY_LISTING:
+            yield from jsonld
+            frontier.extend(_collect_links(page, cfg), kind=PRIORITY_DETAIL, venue=cfg.source)
+            continue
+        events = jsonld or [_fallback_event(page, item.url, cfg.source)]
+        yield from frontier.complete(item, events)
+
+
+def fetch(max_events: int = 200, venues: Optional[Collection[str]] = None) -> list[Event]:
+    return list(iter_events(max_events=max_events, venues=venues))
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
-from collections import deque
 import json
 import re
+from typing import Iterator
+
 from bs4 import BeautifulSoup
 
 from .common import (
     Event,
+    cached_extraction,
     extract_jsonld_events,
     infer_categories,
     normalize_space,
     parse_age_ranges,
     parse_date,
+    parse_price,
     summarize_age_ranges,
 )
+from .frontier import PRIORITY_API, PRIORITY_DETAIL, PRIORITY_LISTING, Frontier
 from .http import get
 
 BASE = "https://www.esplanade.com"
@@ -135,6 +139,7 @@ def _fetch_listing_component_events(html: str) -> tuple[list[Event], list[str]]:
                 continue
             age_ranges = parse_age_ranges(page_data.get("Description") or "")
             age_min, age_max = summarize_age_ranges(age_ranges)
+            price_min, price_max, currency, is_free = parse_price(item.get("PriceRange"))
             categories = infer_categories(
                 title=title,
                 url=event_url,
@@ -156,6 +161,10 @@ def _fetch_listing_component_events(html: str) -> tuple[list[Event], list[str]]:
                     end=parse_date(item.get("PerformanceEndDate")),
                     venue=item.get("VenueName"),
                     price=item.get("PriceRange"),
+                    price_min=price_min,
+                    price_max=price_max,
+                    currency=currency,
+                    is_free=is_free,
                     age_min=age_min,
                     age_max=age_max,
                     age_ranges=age_ranges or None,
@@ -170,84 +179,84 @@ def _fetch_listing_component_events(html: str) -> tuple[list[Event], list[str]]:
     return out_events, out_links
 
 
-def fetch(max_events: int = 80) -> list[Event]:
+@cached_extraction
+def _fallback_event(page: str, url: str) -> Event:
+    soup_ev = BeautifulSoup(page, "lxml")
+    title_el = soup_ev.find("h1")
+    date_pattern = re.compile(
+        r"\b\d{1,2}\s+[A-Za-z]{3,9}\s+\d{2,4}\b|(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s*(?:/|,|\s+\d)",
+        flags=re.IGNORECASE,
+    )
+    date_text = None
+    for tag in soup_ev.find_all(["time", "p", "div", "span", "li", "h3", "h4"]):
+        text = normalize_space(tag.get_text(" ", strip=True))
+        if not text or len(text) > 140:
+            continue
+        low = text.lower()
+        if "window.datalayer" in low or "copyright" in low or "last updated" in low:
+            continue
+        if date_pattern.search(text):
+            date_text = text
+            break
+    page_category = ""
+    page_category_meta = soup_ev.find("meta", attrs={"name": "pageCategory"})
+    if page_category_meta:
+        page_category = page_category_meta.get("content") or ""
+    start = parse_date(date_text) if date_text else None
+    age_ranges = parse_age_ranges(page)
+    age_min, age_max = summarize_age_ranges(age_ranges)
+    title = normalize_space(title_el.get_text()) if title_el else "(Esplanade event)"
+    return Event(
+        title=title,
+        url=url,
+        source="esplanade",
+        start=start,
+        age_min=age_min,
+        age_max=age_max,
+        age_ranges=age_ranges or None,
+        categories=infer_categories(
+            title=title,
+            url=url,
+            source="esplanade",
+            text_blob=page_category,
+        ) or None,
+        raw_date=date_text,
+    )
+
+
+def iter_events(max_events: int = 80) -> Iterator[Event]:
     html = get(LISTING)
     if not html:
-        return []
-    events: list[Event] = []
-    seed_links = PRIORITY_PAGES + _collect_whats_on_links(html, limit=max_events)
-    queue = deque()
-    for link in seed_links:
-        if link not in queue:
-            queue.append(link)
-    visited: set[str] = set()
-    max_pages = max(max_events + 40, 80)
-
-    while queue and len(visited) < max_pages:
-        url = queue.popleft()
-        if url in visited:
-            continue
-        visited.add(url)
+        return
+    # Pages hosting the listing component go first, then the event pages it
+    # returns, then anything else linked from the site chrome.
+    frontier = Frontier(budget=max(max_events + 40, 80), source="esplanade")
+    frontier.extend(PRIORITY_PAGES, kind=PRIORITY_API)
+    frontier.extend(_collect_whats_on_links(html, limit=max_events), kind=PRIORITY_LISTING)
+    del html
+
+    for item in frontier:
+        url = item.url
         page = get(url)
         if not page:
             continue
         listing_events, listing_links = _fetch_listing_component_events(page)
-        events.extend(listing_events)
-        # Prioritize component-listed event links so details (age/date) are crawled before cap.
-        for child in listing_links:
-            if child not in visited and child not in queue:
-                queue.appendleft(child)
-        for child in _collect_whats_on_links(page, limit=24):
-            if child not in visited and child not in queue:
-                queue.append(child)
+        yield from listing_events
+        frontier.extend(listing_links, kind=PRIORITY_DETAIL)
+        frontier.extend(_collect_whats_on_links(page, limit=24), kind=PRIORITY_LISTING)
         jsonld = extract_jsonld_events(
             page,
             "esplanade",
             page_url=url,
             fallback_age_text=page,
         )
-        events.extend(jsonld)
-        if not jsonld:
-            # Fallback: minimal extraction from page header
-            soup_ev = BeautifulSoup(page, "lxml")
-            title_el = soup_ev.find("h1")
-            date_pattern = re.compile(
-                r"\b\d{1,2}\s+[A-Za-z]{3,9}\s+\d{2,4}\b|(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s*(?:/|,|\s+\d)",
-                flags=re.IGNORECASE,
-            )
-            date_text = None
-            for tag in soup_ev.find_all(["time", "p", "div", "span", "li", "h3", "h4"]):
-                text = normalize_space(tag.get_text(" ", strip=True))
-                if not text or len(text) > 140:
-                    continue
-                low = text.lower()
-                if "window.datalayer" in low or "copyright" in low or "last updated" in low:
-                    continue
-                if date_pattern.search(text):
-                    date_text = text
-                    break
-            page_category = ""
-            page_category_meta = soup_ev.find("meta", attrs={"name": "pageCategory"})
-            if page_category_meta:
-                page_category = page_category_meta.get("content") or ""
-            start = parse_date(date_text) if date_text else None
-            age_ranges = parse_age_ranges(page)
-            age_min, age_max = summarize_age_ranges(age_ranges)
-            title = normalize_space(title_el.get_text()) if title_el else "(Esplanade event)"
-            events.append(Event(
-                title=title,
-                url=url,
-                source="esplanade",
-                start=start,
-                age_min=age_min,
-                age_max=age_max,
-                age_ranges=age_ranges or None,
-                categories=infer_categories(
-                    title=title,
-                    url=url,
-                    source="esplanade",
-                    text_blob=page_category,
-                ) or None,
-                raw_date=date_text,
-            ))
-    return events
+        # Fallback: minimal extraction from page header
+        events = jsonld or [_fallback_event(page, url)]
+        if item.kind == PRIORITY_API:
+            yield from events
+        else:
+            yield from frontier.complete(item, events)
+
+
+def fetch(max_events: int = 80) -> list[Event]:
+    return list(iter_events(max_events=max_events))
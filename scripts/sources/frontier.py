@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import urldefrag
+
+from . import crawl_state
+from .common import Event, is_probable_event
+
+# Priority classes, highest first. Within a venue the frontier always drains
+# the best non-empty class, highest-yield URL pattern first; across venues it
+# round-robins.
+PRIORITY_API = 0
+PRIORITY_DETAIL = 1
+PRIORITY_LISTING = 2
+PRIORITY_CLASSES = (PRIORITY_API, PRIORITY_DETAIL, PRIORITY_LISTING)
+
+
+@dataclass(frozen=True)
+class CrawlItem:
+    url: str
+    kind: int = PRIORITY_DETAIL
+    venue: str = ""
+
+
+class Frontier:
+    """Deduplicated crawl queue with priority classes and fair venue rotation.
+
+    ``budget`` caps the pages handed out for the whole source; ``venue_budgets``
+    (or ``default_venue_budget``) caps each venue so a large venue cannot use up
+    the source budget before the others get a turn. Detail URLs the crawl state
+    says keep failing or yielding nothing are not queued (listing and hub
+    pages always are, as their links are the way in), and within a class URLs
+    whose pattern kept the most events in recent runs are handed out first.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[int] = None,
+        venue_budgets: Optional[dict[str, int]] = None,
+        default_venue_budget: Optional[int] = None,
+        source: str = "",
+        state: Optional[crawl_state.CrawlState] = None,
+    ):
+        self.budget = budget
+        self.venue_budgets = dict(venue_budgets or {})
+        self.default_venue_budget = default_venue_budget
+        self.source = source
+        self.state = state if state is not None else crawl_state.active()
+        self.skipped = 0
+        self.spent: Counter[str] = Counter()
+        # Keyed per venue so a venue's crawl never depends on which other venues
+        # share the frontier.
+        self._seen: set[tuple[str, str]] = set()
+        self._queues: dict[str, tuple[list[tuple[float, int, CrawlItem]], ...]] = {}
+        self._order = itertools.count()
+        self._scores: dict[str, dict[str, float]] = {}
+        self._rotation: deque[str] = deque()
+        self._active: set[str] = set()
+
+    def _venue_budget(self, venue: str) -> Optional[int]:
+        return self.venue_budgets.get(venue, self.default_venue_budget)
+
+    def _venue_exhausted(self, venue: str) -> bool:
+        limit = self._venue_budget(venue)
+        return limit is not None and self.spent[venue] >= limit
+
+    def exhausted(self) -> bool:
+        return self.budget is not None and sum(self.spent.values()) >= self.budget
+
+    def _score(self, url: str, venue: str) -> float:
+        if self.state is None:
+            return 0.0
+        source = self.source or venue
+        scores = self._scores.get(source)
+        if scores is None:
+            scores = self._scores[source] = self.state.pattern_scores(source)
+        return scores.get(crawl_state.url_pattern(url), crawl_state.pattern_score(0, 0))
+
+    def seen(self, url: str, venue: str = "") -> bool:
+        return (venue, urldefrag(url)[0]) in self._seen
+
+    def add(self, url: str, kind: int = PRIORITY_DETAIL, venue: str = "") -> bool:
+        key = (venue, urldefrag(url)[0])
+        if not key[1] or key in self._seen:
+            return False
+        self._seen.add(key)
+        if self._venue_exhausted(venue):
+            return False
+        if kind == PRIORITY_DETAIL and self.state is not None and self.state.should_skip(url):
+            self.skipped += 1
+            return False
+        queues = self._queues.get(venue)
+        if queues is None:
+            queues = tuple([] for _ in PRIORITY_CLASSES)
+            self._queues[venue] = queues
+        item = CrawlItem(url=url, kind=kind, venue=venue)
+        heapq.heappush(queues[kind], (-self._score(url, venue), next(self._order), item))
+        if venue not in self._active:
+            self._active.add(venue)
+            self._rotation.append(venue)
+        return True
+
+    def extend(self, urls: Iterable[str], kind: int = PRIORITY_DETAIL, venue: str = "") -> int:
+        return sum(1 for url in urls if self.add(url, kind=kind, venue=venue))
+
+    def pop(self) -> Optional[CrawlItem]:
+        while self._rotation and not self.exhausted():
+            venue = self._rotation.popleft()
+            pending = next((q for q in self._queues[venue] if q), None)
+            if pending is None or self._venue_exhausted(venue):
+                self._active.discard(venue)
+                continue
+            self._rotation.append(venue)
+            self.spent[venue] += 1
+            return heapq.heappop(pending)[-1]
+        return None
+
+    def complete(self, item: CrawlItem, events: Iterable[Optional[Event]]) -> List[Event]:
+        """Record what a fetched page produced and hand the events back."""
+        produced = [ev for ev in events if ev is not None]
+        if self.state is not None:
+            self.state.record_events(
+                item.url,
+                self.source or item.venue,
+                produced,
+                # Hubs and listings are judged by their links, not their own events.
+                productive=any(is_probable_event(ev) for ev in produced) if item.kind == PRIORITY_DETAIL else None,
+            )
+        return produced
+
+    def __iter__(self) -> Iterator[CrawlItem]:
+        while True:
+            item = self.pop()
+            if item is None:
+                return
+            yield item
+
+    def __len__(self) -> int:
+        return sum(len(q) for queues in self._queues.values() for q in queues)
@@ -1,20 +1,136 @@
 import logging
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
 import requests
 
+from . import crawl_state
+
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; SGKidsCultureBot/0.1; +https://example.com)"
 }
 
+TIMEOUT = 15.0
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Refuse requests after ``seconds`` on this thread; nests with outer deadlines."""
+    previous = getattr(_local, "deadline", None)
+    current = previous
+    if seconds is not None:
+        expires = time.monotonic() + seconds
+        current = expires if previous is None else min(previous, expires)
+    _local.deadline = current
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def _request_timeout() -> float:
+    expires = getattr(_local, "deadline", None)
+    if expires is None:
+        return TIMEOUT
+    remaining = expires - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("deadline reached")
+    return min(TIMEOUT, remaining)
+
 
 def get(url: str, params: Optional[dict] = None) -> Optional[str]:
+    timeout = _request_timeout()
+    state = crawl_state.active()
+    try:
+        resp = requests.get(url, params=params, headers=DEFAULT_HEADERS, timeout=timeout)
+    except requests.RequestException as exc:
+        logging.warning("GET %s failed: %s", url, exc)
+        if state is not None and not params:
+            state.record_fetch(url, 0)
+        return None
+    # Record under the requested URL so callers can look it up before fetching.
+    recorded_url = resp.url if params else url
+    if resp.status_code >= 400:
+        logging.warning("GET %s failed with %s", resp.url, resp.status_code)
+        if state is not None:
+            state.record_fetch(recorded_url, resp.status_code)
+        return None
+    if state is not None:
+        state.record_fetch(
+            recorded_url,
+            resp.status_code,
+            body=resp.text,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+    return resp.text
+
+
+def get_many(urls: List[str], workers: int = 4) -> List[Optional[str]]:
+    """``get`` each of ``urls`` on up to ``workers`` threads; bodies come back in order.
+
+    Workers run under the calling thread's deadline, and a DeadlineExceeded
+    from any of them is raised here.
+    """
+    if workers <= 1 or len(urls) <= 1:
+        return [get(url) for url in urls]
+    expires = getattr(_local, "deadline", None)
+
+    def fetch(url: str) -> Optional[str]:
+        _local.deadline = expires
+        try:
+            return get(url)
+        finally:
+            _local.deadline = None
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+        return list(pool.map(fetch, urls))
+
+
+def stream(url: str, chunk_size: int = 64 * 1024) -> Optional[Iterator[bytes]]:
+    """Like ``get``, but the body arrives as byte chunks instead of one string.
+
+    Returns None when the request fails. Only one chunk is held at a time;
+    the connection is released once the iterator is exhausted or closed.
+    """
+    timeout = _request_timeout()
+    state = crawl_state.active()
     try:
-        resp = requests.get(url, params=params, headers=DEFAULT_HEADERS, timeout=15)
-        if resp.status_code >= 400:
-            logging.warning("GET %s failed with %s", resp.url, resp.status_code)
-            return None
-        return resp.text
+        resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=timeout, stream=True)
     except requests.RequestException as exc:
         logging.warning("GET %s failed: %s", url, exc)
+        if state is not None:
+            state.record_fetch(url, 0)
         return None
+    if resp.status_code >= 400:
+        logging.warning("GET %s failed with %s", resp.url, resp.status_code)
+        resp.close()
+        if state is not None:
+            state.record_fetch(url, resp.status_code)
+        return None
+    if state is not None:
+        state.record_fetch(
+            url,
+            resp.status_code,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+    return _iter_body(resp, chunk_size)
+
+
+def _iter_body(resp: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    try:
+        yield from resp.iter_content(chunk_size)
+    except requests.RequestException as exc:
+        logging.warning("GET %s failed while reading: %s", resp.url, exc)
+    finally:
+        resp.close()
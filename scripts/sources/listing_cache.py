@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Generator, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+from .common import EXTRACTOR_VERSION, SG_TZ, Event, normalize_space
+
+CACHE_VERSION = 1
+# Replayed results are re-crawled after this long even if the listing is unchanged.
+MAX_AGE_DAYS = 14
+
+TRACKING_PARAM_RE = re.compile(r"^(utm_\w+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|_ga|_gl|_hs\w+|sessionid|sid)$", re.IGNORECASE)
+
+# Text that changes between requests without the listing itself changing.
+NOISE_PATTERNS = [
+    re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"),
+    re.compile(r"\b\d{1,2}:\d{2}:\d{2}\b"),
+    re.compile(r"\b\d{10,13}\b"),
+    re.compile(r"\b[A-Za-z0-9_\-]{32,}\b"),
+]
+
+NOISE_TAGS = ["script", "style", "noscript", "template", "svg", "iframe"]
+
+
+def canonical_link(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAM_RE.match(k)]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ""))
+
+
+def listing_fingerprint(html: Union[str, BeautifulSoup], links: Iterable[str], variant: str = "") -> str:
+    """Hash of a listing's visible text and link set, ignoring per-request noise.
+
+    Attribute values (CSRF tokens, nonces, tracking pixels) never reach the
+    text, and scripts/styles are dropped before extraction. A parsed soup may
+    be passed instead of HTML; it is modified in place. ``EXTRACTOR_VERSION``
+    is hashed in, so an extractor change re-crawls unchanged listings.
+    """
+    soup = BeautifulSoup(html, "lxml") if isinstance(html, str) else html
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    text = normalize_space(soup.get_text(" "))
+    for pattern in NOISE_PATTERNS:
+        text = pattern.sub("", text)
+    digest = hashlib.sha256()
+    digest.update(f"{EXTRACTOR_VERSION}:{variant}".encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    for link in sorted({canonical_link(link) for link in links}):
+        digest.update(b"\0")
+        digest.update(link.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ListingCache:
+    """Detail-crawl results per source, keyed by the listing fingerprint."""
+
+    def __init__(self, path: Path, entries: Optional[dict] = None, replay: bool = True):
+        self.path = path
+        self.entries: dict = entries or {}
+        self.replay = replay
+
+    @classmethod
+    def load(cls, path: Path, replay: bool = True) -> "ListingCache":
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cls(path, replay=replay)
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return cls(path, replay=replay)
+        return cls(path, data.get("sources") or {}, replay=replay)
+
+    def lookup(self, source: str, fingerprint: str) -> Optional[List[Event]]:
+        if not self.replay:
+            return None
+        entry = self.entries.get(source) or {}
+        if entry.get("fingerprint") != fingerprint:
+            return None
+        try:
+            checked = datetime.fromisoformat(entry["checked_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if datetime.now(tz=SG_TZ) - checked > timedelta(days=MAX_AGE_DAYS):
+            return None
+        try:
+            return [Event.from_dict(row) for row in entry.get("events") or []]
+        except (TypeError, ValueError):
+            return None
+
+    def record(self, source: str, fingerprint: str, links: Iterable[str], events: Iterable[Event]):
+        self.entries[source] = {
+            "fingerprint": fingerprint,
+            "links": sorted({canonical_link(link) for link in links}),
+            "checked_at": datetime.now(tz=SG_TZ).isoformat(),
+            "events": [ev.to_dict() for ev in events],
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "sources": self.entries}, f)
+        tmp.replace(self.path)
+
+
+_active: Optional[ListingCache] = None
+
+
+def activate(cache: Optional[ListingCache]):
+    global _active
+    _active = cache
+
+
+def replay_or_crawl(
+    source: str,
+    fingerprint: str,
+    links: List[str],
+    crawl: Generator[Event, None, bool],
+) -> Iterator[Event]:
+    """Serve ``source`` from the cache when its listing is unchanged, else run ``crawl``.
+
+    ``crawl`` is an unstarted generator returning whether every detail page
+    it tried was fetched; results are stored only when it runs to completion
+    and returns True, so pages that failed are not replayed as missing.
+    """
+    cache = _active
+    if cache is None:
+        yield from crawl
+        return
+    cached = cache.lookup(source, fingerprint)
+    if cached is not None:
+        crawl.close()
+        yield from cached
+        return
+    events: List[Event] = []
+    while True:
+        try:
+            event = next(crawl)
+        except StopIteration as stop:
+            complete = stop.value
+            break
+        events.append(event)
+        yield event
+    if complete:
+        cache.record(source, fingerprint, links, events)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from typing import Iterator
+
 from bs4 import BeautifulSoup
 
 from .common import (
     Event,
+    cached_extraction,
     extract_jsonld_events,
     infer_categories,
     normalize_space,
@@ -12,6 +15,7 @@ from .common import (
     parse_date_range,
     summarize_age_ranges,
 )
+from .frontier import PRIORITY_DETAIL, PRIORITY_LISTING, Frontier
 from .http import get
 
 NMS_BASE = "https://www.nhb.gov.sg/nationalmuseum"
@@ -48,48 +52,55 @@ def _collect_links(html: str, base: str, limit: int = 15) -> list[str]:
     return links
 
 
-def fetch(max_events: int = 25) -> list[Event]:
-    events: list[Event] = []
+@cached_extraction
+def _fallback_event(page: str, url: str) -> Event:
+    soup_ev = BeautifulSoup(page, "lxml")
+    title_el = soup_ev.find("h1")
+    start, end, raw_date = parse_date_range(page)
+    date_el = soup_ev.find(string=lambda s: s and any(ch.isdigit() for ch in s))
+    if not start:
+        start = parse_date(date_el) if date_el else None
+    age_ranges = parse_age_ranges(page)
+    age_min, age_max = summarize_age_ranges(age_ranges)
+    title = normalize_space(title_el.get_text()) if title_el else "(Museum event)"
+    fallback_date_text = normalize_space(date_el) if date_el else None
+    return Event(
+        title=title,
+        url=url,
+        source="nhb",
+        start=start,
+        end=end,
+        age_min=age_min,
+        age_max=age_max,
+        age_ranges=age_ranges or None,
+        categories=infer_categories(
+            title=title,
+            url=url,
+            source="nhb",
+            text_blob=raw_date or (normalize_space(date_el) if date_el else ""),
+        ) or None,
+        raw_date=raw_date or fallback_date_text,
+    )
+
+
+def iter_events(max_events: int = 25) -> Iterator[Event]:
+    bases = {NMS_LISTING: NMS_BASE, ACM_LISTING: ACM_BASE}
+    frontier = Frontier(default_venue_budget=max_events + 1, source="nhb")
+    for listing, base in bases.items():
+        frontier.add(listing, kind=PRIORITY_LISTING, venue=base)
 
-    for base, listing in [(NMS_BASE, NMS_LISTING), (ACM_BASE, ACM_LISTING)]:
-        html = get(listing)
-        if not html:
+    for item in frontier:
+        url = item.url
+        page = get(url)
+        if not page:
             continue
-        events.extend(extract_jsonld_events(html, "nhb", page_url=listing))
-        links = _collect_links(html, base, limit=max_events)
-        for url in links:
-            page = get(url)
-            if not page:
-                continue
-            jsonld = extract_jsonld_events(page, "nhb", page_url=url)
-            if jsonld:
-                events.extend(jsonld)
-                continue
-            soup_ev = BeautifulSoup(page, "lxml")
-            title_el = soup_ev.find("h1")
-            start, end, raw_date = parse_date_range(page)
-            date_el = soup_ev.find(string=lambda s: s and any(ch.isdigit() for ch in s))
-            if not start:
-                start = parse_date(date_el) if date_el else None
-            age_ranges = parse_age_ranges(page)
-            age_min, age_max = summarize_age_ranges(age_ranges)
-            title = normalize_space(title_el.get_text()) if title_el else "(Museum event)"
-            fallback_date_text = normalize_space(date_el) if date_el else None
-            events.append(Event(
-                title=title,
-                url=url,
-                source="nhb",
-                start=start,
-                end=end,
-                age_min=age_min,
-                age_max=age_max,
-                age_ranges=age_ranges or None,
-                categories=infer_categories(
-                    title=title,
-                    url=url,
-                    source="nhb",
-                    text_blob=raw_date or (normalize_space(date_el) if date_el else ""),
-                ) or None,
-                raw_date=raw_date or fallback_date_text,
-            ))
-    return events
+        if item.kind == PRIORITY_LISTING:
+            yield from extract_jsonld_events(page, "nhb", page_url=url)
+            frontier.extend(_collect_links(page, item.venue, limit=max_events), kind=PRIORITY_DETAIL, venue=item.venue)
+            continue
+        events = extract_jsonld_events(page, "nhb", page_url=url) or [_fallback_event(page, url)]
+        yield from frontier.complete(item, events)
+
+
+def fetch(max_events: int = 25) -> list[Event]:
+    return list(iter_events(max_events=max_events))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+CACHE_VERSION = 1
+KEEP_UNUSED_DAYS = 60
+
+# Per-request attributes that never feed the extractors.
+VOLATILE_ATTR_RE = re.compile(
+    r"""\s(?:nonce|data-csrf|data-token|data-request-id)=(?:"[^"]*"|'[^']*')|"""
+    r"""(<input\b[^>]*\btype=["']?hidden["']?[^>]*\bvalue=)(?:"[^"]*"|'[^']*')|"""
+    r"""(<meta\b[^>]*\bname=["']?csrf[-_\w]*["']?[^>]*\bcontent=)(?:"[^"]*"|'[^']*')""",
+    re.IGNORECASE,
+)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _blank_volatile(match: re.Match) -> str:
+    prefix = match.group(1) or match.group(2)
+    return f'{prefix}""' if prefix else ""
+
+
+def content_hash(body: str) -> str:
+    normalized = VOLATILE_ATTR_RE.sub(_blank_volatile, body)
+    normalized = WHITESPACE_RE.sub(" ", normalized).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def cache_key(extractor: str, body: str, args: tuple, kwargs: dict) -> str:
+    parts = [extractor, content_hash(body)]
+    for value in list(args) + [f"{k}={v}" if v is not body else f"{k}=<body>" for k, v in sorted(kwargs.items())]:
+        text = str(value)
+        parts.append(text if len(text) <= 200 else hashlib.sha256(text.encode("utf-8")).hexdigest())
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """Extractor results keyed by normalized page content, tied to an extractor version."""
+
+    def __init__(self, path: Path, extractor_version: int, entries: Optional[dict] = None):
+        self.path = path
+        self.extractor_version = extractor_version
+        self.entries: dict = entries or {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path, extractor_version: int) -> "ParseCache":
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cls(path, extractor_version)
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_VERSION
+            or data.get("extractor_version") != extractor_version
+        ):
+            return cls(path, extractor_version)
+        return cls(path, extractor_version, data.get("entries") or {})
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used"] = date.today().isoformat()
+        return entry["result"]
+
+    def put(self, key: str, result: Any):
+        self.entries[key] = {"used": date.today().isoformat(), "result": result}
+
+    def save(self):
+        cutoff = (date.today() - timedelta(days=KEEP_UNUSED_DAYS)).isoformat()
+        entries = {k: v for k, v in self.entries.items() if v.get("used", "") >= cutoff}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CACHE_VERSION, "extractor_version": self.extractor_version, "entries": entries},
+                f,
+            )
+        tmp.replace(self.path)
+
+
+_active: Optional[ParseCache] = None
+
+
+def activate(cache: Optional[ParseCache]):
+    global _active
+    _active = cache
+
+
+def active() -> Optional[ParseCache]:
+    return _active
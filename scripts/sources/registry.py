@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .venue_configs import CONFIGS as VENUE_CONFIGS
+
+
+@dataclass(frozen=True)
+class SourceEntry:
+    name: str
+    module: str
+    # Event ``source`` values it produces, in crawl order.
+    venues: Tuple[str, ...]
+
+
+# Crawl order. Selection and ordering only read this table; modules are
+# imported when a run actually crawls them.
+_REGISTRY: Dict[str, SourceEntry] = {}
+
+
+def register(name: str, module: Optional[str] = None, venues: Sequence[str] = ()):
+    _REGISTRY[name] = SourceEntry(name=name, module=module or name, venues=tuple(venues) or (name,))
+
+
+for _name in ("esplanade", "sso", "sco", "artshouse", "gallery", "nhb"):
+    register(_name)
+register("cultural_centres", venues=[cfg.source for cfg in VENUE_CONFIGS])
+
+
+def names() -> List[str]:
+    return list(_REGISTRY)
+
+
+def load(name: str) -> ModuleType:
+    return importlib.import_module(f"{__package__}.{_REGISTRY[name].module}")
+
+
+def venues(name: str) -> List[str]:
+    """Event ``source`` values a registered source produces (its venues, if any)."""
+    return list(_REGISTRY[name].venues)
+
+
+def _owner(venue: str) -> str:
+    for name, entry in _REGISTRY.items():
+        if venue in entry.venues:
+            return name
+    raise ValueError(f"unknown source or venue: {venue}")
+
+
+def select(only: Iterable[str] = (), exclude: Iterable[str] = ()) -> Dict[str, List[str]]:
+    """Sources to run, in crawl order, each mapped to the venues to run.
+
+    ``only`` and ``exclude`` accept registered source names or venue names
+    such as ``acm``.
+    """
+    only = list(only)
+    chosen: Dict[str, List[str]] = {}
+    for selector in only:
+        if selector in _REGISTRY:
+            chosen[selector] = venues(selector)
+            continue
+        owner = _owner(selector)
+        picked = chosen.setdefault(owner, [])
+        if selector not in picked:
+            picked.append(selector)
+    if not only:
+        chosen = {name: venues(name) for name in _REGISTRY}
+    for selector in exclude:
+        if selector in _REGISTRY:
+            chosen.pop(selector, None)
+            continue
+        owner = _owner(selector)
+        if owner in chosen:
+            chosen[owner] = [venue for venue in chosen[owner] if venue != selector]
+    selection: Dict[str, List[str]] = {}
+    for name in _REGISTRY:
+        if chosen.get(name):
+            order = venues(name)
+            selection[name] = sorted(chosen[name], key=order.index)
+    return selection
+
+
+def source_order() -> Dict[str, int]:
+    """Canonical position of every event ``source``: registry order, then venue order."""
+    order: Dict[str, int] = {}
+    for name in _REGISTRY:
+        for venue in venues(name):
+            order.setdefault(venue, len(order))
+    return order
+
+
+def shard_of(unit: str, count: int) -> int:
+    return int(hashlib.sha1(unit.encode("utf-8")).hexdigest(), 16) % count
+
+
+def shard(selection: Dict[str, List[str]], index: int, count: int) -> Dict[str, List[str]]:
+    """The part of ``selection`` owned by shard ``index`` of ``count``, split by venue."""
+    sharded: Dict[str, List[str]] = {}
+    for name, picked in selection.items():
+        mine = [venue for venue in picked if shard_of(venue, count) == index]
+        if mine:
+            sharded[name] = mine
+    return sharded
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional
+from urllib.parse import urljoin, urlsplit
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import dateutil.parser
+
+from .common import SG_TZ
+from .http import get, stream
+
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_INDEX_DEPTH = 2
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    url: str
+    lastmod: Optional[datetime] = None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_lastmod(text: Optional[str]) -> Optional[datetime]:
+    if not text:
+        return None
+    try:
+        value = dateutil.parser.isoparse(text.strip())
+    except (ValueError, OverflowError):
+        return None
+    if value.tzinfo is None:
+        value = SG_TZ.localize(value)
+    return value
+
+
+def robots_sitemaps(base: str) -> List[str]:
+    """Sitemap URLs advertised in the site's robots.txt."""
+    parts = urlsplit(base)
+    robots = get(f"{parts.scheme}://{parts.netloc}/robots.txt")
+    if not robots:
+        return []
+    sitemaps: List[str] = []
+    for line in robots.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            url = urljoin(base, value.strip())
+            if url not in sitemaps:
+                sitemaps.append(url)
+    return sitemaps
+
+
+def _read_entries(parser: XMLPullParser, children: List[str]) -> Iterator[SitemapEntry]:
+    for _, elem in parser.read_events():
+        tag = _local(elem.tag)
+        if tag not in ("url", "sitemap"):
+            continue
+        loc = lastmod = None
+        for child in elem:
+            name = _local(child.tag)
+            if name == "loc":
+                loc = (child.text or "").strip()
+            elif name == "lastmod":
+                lastmod = child.text
+        elem.clear()
+        if not loc:
+            continue
+        if tag == "sitemap":
+            children.append(loc)
+        else:
+            yield SitemapEntry(url=loc, lastmod=_parse_lastmod(lastmod))
+
+
+def iter_sitemap(url: str, depth: int = 0) -> Iterator[SitemapEntry]:
+    """Stream ``<url>`` entries from a sitemap, following sitemap indexes.
+
+    The response is read and parsed a chunk at a time (gzipped sitemaps are
+    inflated on the way), and elements are cleared as soon as they are read,
+    so a large sitemap is never held whole in memory.
+    """
+    chunks = stream(url, chunk_size=CHUNK_SIZE)
+    if chunks is None:
+        return
+    parser = XMLPullParser(events=("end",))
+    children: List[str] = []
+    inflate = None
+    try:
+        for index, chunk in enumerate(chunks):
+            if index == 0 and chunk.startswith(GZIP_MAGIC):
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            parser.feed(inflate.decompress(chunk) if inflate else chunk)
+            yield from _read_entries(parser, children)
+        if inflate:
+            parser.feed(inflate.flush())
+        parser.close()
+        yield from _read_entries(parser, children)
+    except (ParseError, zlib.error) as exc:
+        logging.warning("Sitemap %s is not valid XML: %s", url, exc)
+        return
+    finally:
+        chunks.close()
+    if depth >= MAX_INDEX_DEPTH:
+        return
+    for child in children:
+        yield from iter_sitemap(child, depth=depth + 1)
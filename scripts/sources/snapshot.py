@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .common import SG_TZ, Event
+
+SNAPSHOT_VERSION = 1
+
+
+class SourceSnapshot:
+    """Raw events from each source's last completed crawl, with timestamps."""
+
+    def __init__(self, path: Path, sources: Optional[dict] = None):
+        self.path = path
+        self.sources: dict = sources or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "SourceSnapshot":
+        try:
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return cls(path)
+        return cls(path, data.get("sources") or {})
+
+    def fetched_at(self, source: str) -> Optional[datetime]:
+        entry = self.sources.get(source) or {}
+        try:
+            return datetime.fromisoformat(entry["fetched_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def is_fresh(self, source: str, ttl_days: float, now: Optional[datetime] = None) -> bool:
+        fetched = self.fetched_at(source)
+        if fetched is None or ttl_days <= 0:
+            return False
+        now = now or datetime.now(tz=SG_TZ)
+        return now - fetched < timedelta(days=ttl_days)
+
+    def events(self, source: str) -> List[Event]:
+        out: List[Event] = []
+        for row in (self.sources.get(source) or {}).get("events") or []:
+            try:
+                out.append(Event.from_dict(row))
+            except (TypeError, ValueError):
+                continue
+        return out
+
+    def record(self, source: str, events: Iterable[Event], fetched_at: Optional[datetime] = None):
+        fetched_at = fetched_at or datetime.now(tz=SG_TZ)
+        self.sources[source] = {
+            "fetched_at": fetched_at.isoformat(),
+            "events": [ev.to_dict() for ev in events],
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "sources": self.sources}, f)
+        tmp.replace(self.path)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Callable, Generator, Iterator, Optional
+
+from bs4 import BeautifulSoup
+
+from .common import (
+    Event,
+    cached_extraction,
+    extract_jsonld_events,
+    infer_categories,
+    normalize_space,
+    parse_age_ranges,
+    parse_date,
+    summarize_age_ranges,
+)
+from .frontier import PRIORITY_DETAIL, Frontier
+from .http import get, get_many
+from .listing_cache import listing_fingerprint, replay_or_crawl
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """A single-listing source: one listing page linking to event detail pages.
+
+    Detail pages are read as JSON-LD, falling back to the first ``<h1>`` and a
+    date found by ``date_text`` (a key of ``DATE_FINDERS``). Up to
+    ``fetch_workers`` detail pages are fetched at once.
+    """
+
+    source: str
+    base: str
+    listing: str
+    link_terms: tuple[str, ...]
+    fallback_title: str
+    date_text: str = "first_digit"
+    max_events: int = 20
+    fetch_workers: int = 4
+
+
+def _first_digit_text(soup: BeautifulSoup) -> Optional[str]:
+    return soup.find(string=lambda s: s and any(ch.isdigit() for ch in s))
+
+
+def _when_label_text(soup: BeautifulSoup) -> Optional[str]:
+    when_label = soup.find(
+        lambda tag: tag.name in {"strong", "h3", "h4"}
+        and tag.get_text(strip=True).lower() == "when"
+    )
+    if when_label:
+        sibling = when_label.find_next_sibling()
+        while sibling is not None:
+            text = sibling.get_text(" ", strip=True)
+            if text:
+                return text
+            sibling = sibling.find_next_sibling()
+    # Fallback to explicit date-like sentence in visible text only.
+    visible = soup.get_text("\n", strip=True)
+    m = re.search(r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s*/\s*\d{1,2}\s*[A-Za-z]{3}\s*\d{2,4}\s*/\s*\d{1,2}(?:\.\d{2})?\s*(?:am|pm)", visible, flags=re.IGNORECASE)
+    return m.group(0) if m else None
+
+
+DATE_FINDERS: dict[str, Callable[[BeautifulSoup], Optional[str]]] = {
+    "first_digit": _first_digit_text,
+    "when_label": _when_label_text,
+}
+
+
+def collect_links(soup: BeautifulSoup, spec: SourceSpec) -> list[str]:
+    links: list[str] = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        if href.startswith("/"):
+            href = spec.base + href
+        if href.startswith(spec.base) and any(term in href for term in spec.link_terms):
+            links.append(href)
+    return links
+
+
+@cached_extraction
+def fallback_event(page: str, url: str, spec: SourceSpec) -> Event:
+    soup = BeautifulSoup(page, "lxml")
+    title_el = soup.find("h1")
+    when_text = DATE_FINDERS[spec.date_text](soup)
+    start = parse_date(when_text) if when_text else None
+    age_ranges = parse_age_ranges(page)
+    age_min, age_max = summarize_age_ranges(age_ranges)
+    title = normalize_space(title_el.get_text()) if title_el else spec.fallback_title
+    return Event(
+        title=title,
+        url=url,
+        source=spec.source,
+        start=start,
+        age_min=age_min,
+        age_max=age_max,
+        age_ranges=age_ranges or None,
+        categories=infer_categories(
+            title=title,
+            url=url,
+            source=spec.source,
+            text_blob=normalize_space(when_text) if when_text else "",
+        ) or None,
+        raw_date=normalize_space(when_text) if when_text else None,
+    )
+
+
+def _iter_crawl(spec: SourceSpec, html: str, links: list[str], max_events: int) -> Generator[Event, None, bool]:
+    """Crawl the listing's detail pages; returns whether none failed to fetch.
+
+    Pages the crawl state skips don't count: the same policy skips them on
+    the next crawl too. A deadline abort raises out of the generator.
+    """
+    frontier = Frontier(budget=max_events, source=spec.source)
+    frontier.extend(links, kind=PRIORITY_DETAIL)
+
+    # Events marked up on the listing itself come first.
+    yield from extract_jsonld_events(html, spec.source, page_url=spec.listing)
+    del html
+
+    # Detail pages add no links, so fetching a batch ahead keeps the
+    # frontier's order; pages are parsed in that order on this thread.
+    failed = 0
+    items = iter(frontier)
+    while True:
+        batch = list(itertools.islice(items, spec.fetch_workers))
+        if not batch:
+            break
+        for item, page in zip(batch, get_many([item.url for item in batch], workers=spec.fetch_workers)):
+            if not page:
+                failed += 1
+                continue
+            events = extract_jsonld_events(page, spec.source, page_url=item.url) or [fallback_event(page, item.url, spec)]
+            yield from frontier.complete(item, events)
+    return failed == 0
+
+
+def iter_spec_events(spec: SourceSpec, max_events: Optional[int] = None) -> Iterator[Event]:
+    max_events = spec.max_events if max_events is None else max_events
+    html = get(spec.listing)
+    if not html:
+        return
+    # One parse serves link collection and the listing fingerprint.
+    soup = BeautifulSoup(html, "lxml")
+    links = collect_links(soup, spec)
+    fingerprint = listing_fingerprint(soup, links, variant=str(max_events))
+    del soup
+    crawl = _iter_crawl(spec, html, links, max_events)
+    del html
+    yield from replay_or_crawl(spec.source, fingerprint, links, crawl)
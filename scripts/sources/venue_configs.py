@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Cultural centre venues as plain data, so the registry can list them
+# without importing the scraper.
+
+
+@dataclass(frozen=True)
+class VenueConfig:
+    source: str
+    base: str
+    listings: tuple[str, ...]
+    allow_terms: tuple[str, ...]
+    blocked_terms: tuple[str, ...] = ()
+    max_links: int = 24
+    refresh_days: float = 7
+    # "listing" scrapes anchors from ``listings``; "sitemap" reads ``sitemaps``
+    # (or those advertised in robots.txt) and falls back to the listings when
+    # none are found.
+    discovery: str = "listing"
+    sitemaps: tuple[str, ...] = ()
+
+
+CONFIGS = [
+    VenueConfig(
+        source="wildrice",
+        base="https://www.wildrice.com.sg",
+        listings=(
+            "https://www.wildrice.com.sg/whats-on/",
+        ),
+        allow_terms=("/whats-on/", "/event/", "/events/"),
+        blocked_terms=("/whats-on/page/", "/what-s-on", "/about", "/privacy", "/careers"),
+    ),
+    VenueConfig(
+        source="srt",
+        base="https://www.srt.com.sg",
+        listings=(
+            "https://www.srt.com.sg/",
+            "https://www.srt.com.sg/index",
+        ),
+        allow_terms=("/whats-on", "/event", "/events", "/show", "/production", "/stage-camp"),
+        blocked_terms=(
+            "/about",
+            "/privacy",
+            "/careers",
+            "/contact",
+            "/blog",
+            "/news",
+            "/support",
+            "/friends-of-srt",
+            "/people-at-srt",
+        ),
+        discovery="sitemap",
+    ),
+    VenueConfig(
+        source="practice",
+        base="https://www.practice.org.sg",
+        listings=(
+            "https://www.practice.org.sg/whats-on",
+        ),
+        allow_terms=("/whats-on", "/event", "/events", "/programme", "/programmes"),
+        blocked_terms=("/about", "/privacy", "/careers", "/contact"),
+    ),
+    VenueConfig(
+        source="sam",
+        base="https://www.singaporeartmuseum.sg",
+        listings=(
+            "https://www.singaporeartmuseum.sg/art-events",
+            "https://www.singaporeartmuseum.sg/Art-Events",
+        ),
+        allow_terms=("/art-events/", "/events/", "/event/", "/exhibition"),
+    ),
+    VenueConfig(
+        source="artscience",
+        base="https://www.marinabaysands.com",
+        listings=(
+            "https://www.marinabaysands.com/museum/exhibitions.html",
+        ),
+        allow_terms=("/museum/", "/events/", "/event/", "/exhibition", "/programmes"),
+    ),
+    VenueConfig(
+        source="sandstheatre",
+        base="https://www.marinabaysands.com",
+        listings=(
+            "https://www.marinabaysands.com/entertainment/shows.html",
+        ),
+        allow_terms=("/entertainment/", "/shows/", "/show/", "/events/", "/event/"),
+        blocked_terms=("/entertainment.html",),
+    ),
+    VenueConfig(
+        source="peranakan",
+        base="https://www.nhb.gov.sg/peranakanmuseum",
+        listings=(
+            "https://www.nhb.gov.sg/peranakanmuseum/whatson/exhibitions",
+            "https://www.nhb.gov.sg/peranakanmuseum/whatson/programmes",
+        ),
+        allow_terms=("/whatson/", "/events/", "/event/", "/exhibition", "/programme"),
+        refresh_days=28,
+    ),
+    VenueConfig(
+        source="acm",
+        base="https://www.nhb.gov.sg/acm",
+        listings=(
+            "https://www.nhb.gov.sg/acm/whats-on/overview/",
+            "https://www.nhb.gov.sg/acm/whats-on/programmes",
+            "https://www.nhb.gov.sg/acm/whats-on/exhibitions",
+        ),
+        allow_terms=("/whats-on/", "/exhibitions/", "/programmes/", "/lectures-and-seminars/"),
+        blocked_terms=("/whats-on/overview", "/view-all"),
+    ),
+    VenueConfig(
+        source="ihc",
+        base="https://www.indianheritage.gov.sg",
+        listings=(
+            "https://www.indianheritage.gov.sg/en/whats-on/programmes",
+            "https://www.indianheritage.gov.sg/en/whats-on/exhibitions",
+        ),
+        allow_terms=("/whats-on/", "/events/", "/event/", "/programmes", "/exhibition"),
+    ),
+    VenueConfig(
+        source="childrensmuseum",
+        base="https://www.heritage.sg/childrensmuseum",
+        listings=(
+            "https://www.heritage.sg/childrensmuseum/whatson/activities",
+            "https://www.heritage.sg/childrensmuseum/whatson/exhibitions",
+        ),
+        allow_terms=("/whatson/", "/events/", "/event/", "/programmes", "/exhibition"),
+    ),
+    VenueConfig(
+        source="changi",
+        base="https://www.changichapelmuseum.gov.sg",
+        listings=(
+            "https://www.changichapelmuseum.gov.sg/",
+        ),
+        allow_terms=("/whats-on/", "/events/", "/event/", "/programme", "/exhibition"),
+        refresh_days=28,
+    ),
+    VenueConfig(
+        source="bukitchandu",
+        base="https://www.heritage.sg/reflectionsatbukitchandu",
+        listings=(
+            "https://www.heritage.sg/reflectionsatbukitchandu/whats-on/exhibitions",
+            "https://www.heritage.sg/reflectionsatbukitchandu/whats-on/programmes",
+        ),
+        allow_terms=("/whats-on/", "/events/", "/event/", "/programmes", "/exhibition"),
+    ),
+    VenueConfig(
+        source="sccc",
+        base="https://singaporeccc.org.sg",
+        listings=(
+            "https://singaporeccc.org.sg/events/",
+            "https://singaporeccc.org.sg/whats-on/",
+        ),
+        allow_terms=("/events/", "/event/", "/whats-on/", "/programme", "/programmes"),
+    ),
+    VenueConfig(
+        source="gateway",
+        base="https://gatewaytheatre.sg",
+        listings=(
+            "https://gatewaytheatre.sg/whats-on/",
+            "https://gatewaytheatre.sg/gateway-kids-club/",
+        ),
+        allow_terms=("/events/", "/event/", "/whats-on/", "/gateway-kids-club"),
+    ),
+]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import re
+from html import escape
+from typing import Any, List
+
+PLACEHOLDER_RE = re.compile(r"__([A-Z][A-Z0-9_]*)__")
+
+
+class Raw(str):
+    """Markup that is already safe, inserted without escaping."""
+
+
+class Template:
+    """A template split once into literal text and ``__NAME__`` slots.
+
+    ``render`` fills every slot in one join. Values are HTML-escaped unless
+    wrapped in ``Raw``, and are never scanned for placeholders themselves, so
+    a value containing ``__TITLE__`` comes out literally.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = PLACEHOLDER_RE.split(source)
+        self._literals: List[str] = parts[0::2]
+        self._names: List[str] = parts[1::2]
+        self.names = frozenset(self._names)
+
+    def render(self, **values: Any) -> str:
+        if values.keys() != self.names:
+            missing = sorted(self.names - values.keys())
+            unknown = sorted(values.keys() - self.names)
+            raise KeyError(f"template values missing {missing}, unknown {unknown}")
+        filled = {
+            name: value if isinstance(value, Raw) else escape(str(value))
+            for name, value in values.items()
+        }
+        out = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            out.append(filled[name])
+            out.append(literal)
+        return "".join(out)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+import requests
+
+import scrape
+from sources import crawl_state, listing_cache, parse_cache, registry
+from sources.cultural_centres import CONFIGS
+
+YEAR = datetime.now().year + 1
+# More than any venue's page allowance, so the budget decides what is crawled.
+DETAIL_PAGES = 40
+
+
+def _detail_path(cfg) -> str:
+    return next(
+        path
+        for path in ("/events/", "/whats-on/")
+        if any(term in path for term in cfg.allow_terms) and not any(term in path for term in cfg.blocked_terms)
+    )
+
+
+def _fixture_site() -> dict[str, str]:
+    pages = {}
+    for cfg in CONFIGS:
+        base = cfg.base.rstrip("/") + _detail_path(cfg)
+        links = [f"{base}kids-{cfg.source}-{i}" for i in range(DETAIL_PAGES)]
+        listing = "".join(f'<a href="{url}">More</a>' for url in links)
+        for url in cfg.listings:
+            pages[url] = f"<html><body>{listing}</body></html>"
+        for i, url in enumerate(links):
+            event = {
+                "@type": "Event",
+                "name": f"{cfg.source} kids workshop {i}",
+                "url": url,
+                "startDate": f"{YEAR}-03-{i % 28 + 1:02d}T10:00:00+08:00",
+            }
+            pages[url] = f'<script type="application/ld+json">{json.dumps(event)}</script>'
+    return pages
+
+
+class FakeResponse:
+    def __init__(self, url: str, body: str | None):
+        self.url = url
+        self.status_code = 404 if body is None else 200
+        self.text = body or ""
+        self.headers: dict[str, str] = {}
+
+    def iter_content(self, chunk_size: int):
+        yield self.text.encode("utf-8")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fixture_site(monkeypatch):
+    pages = _fixture_site()
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: FakeResponse(url, pages.get(url)))
+    for module in (crawl_state, listing_cache, parse_cache):
+        module.activate(None)
+    return pages
+
+
+def _run(selection, on_raw=None):
+    return scrape.run(selection=selection, source_budget=None, run_budget=None, on_raw=on_raw)
+
+
+@pytest.mark.parametrize("count", [2, 3, 5])
+def test_shards_merge_to_single_run(fixture_site, tmp_path, count):
+    selection = registry.select(only=["cultural_centres"])
+    single = _run(selection)
+    assert 0 < len(single) < len(CONFIGS) * DETAIL_PAGES
+
+    paths = []
+    for index in range(count):
+        part = registry.shard(selection, index, count)
+        path = tmp_path / f"shard-{index}-of-{count}.jsonl.gz"
+        writer = scrape.open_partial(path, index, count, part)
+        _run(part, on_raw=lambda event: writer.append([event.to_dict()]))
+        writer.close()
+        paths.append(path)
+    merged = scrape.merge_partials(paths)
+
+    assert [ev.to_dict() for ev in merged] == [ev.to_dict() for ev in single]